@@ -4,6 +4,7 @@ import time
 import logging
 from collections import deque
 from notifications.discord import DiscordNotifier
+from services.http import create_session
 
 # --- Configuration ---
 # The API endpoint for recent Bodega trades
@@ -26,7 +27,8 @@ MAX_SEEN_HASHES = 2000
 # --- Initialization ---
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 log = logging.getLogger(__name__)
-notifier = DiscordNotifier(DISCORD_WEBHOOK_URL)
+session = create_session() # Keep-alive connections reused across polls and webhook posts
+notifier = DiscordNotifier(DISCORD_WEBHOOK_URL, session=session)
 
 # --- Main Monitoring Function ---
 def monitor_bodega_activity():
@@ -47,7 +49,7 @@ def monitor_bodega_activity():
 
     while True:
         try:
-            response = requests.get(BODEGA_ACTIVITY_URL, timeout=10)
+            response = session.get(BODEGA_ACTIVITY_URL, timeout=10)
             response.raise_for_status()
             activity_data = response.json().get("data", [])
 
@@ -2,6 +2,7 @@ import os
 import math
 import logging
 import json
+import orjson
 import time
 from datetime import datetime, timezone, timedelta
 from dotenv import load_dotenv
@@ -16,7 +17,7 @@ from py_clob_client.clob_types import OrderArgs, OrderType
 from py_clob_client.order_builder.constants import BUY, SELL
 
 # --- Local Project Imports ---
-from config import m_client, p_client, notifier, log, myriad_account, myriad_contract
+from config import m_client, p_client, notifier, log, http_session, myriad_account, myriad_contract
 import streamlit_app.db as db
 import services.myriad.model as myriad_model
 from services.myriad.model import consume_order_book # Import for re-validation
@@ -121,7 +122,7 @@ def find_myriad_trade_details(market_id: int, expected_cost: float, myriad_addre
     for i in range(15):
         log.info(f"[{trade_id}] Attempt {i+1}/15 to fetch Myriad trade details...")
         try:
-            response = requests.get(api_url, timeout=15)
+            response = http_session.get(api_url, timeout=15)
             response.raise_for_status()
             
             json_response = response.json()
@@ -229,12 +230,11 @@ def get_polymarket_positions() -> dict:
         log.info(f"[POLY] Fetching positions for user {POLY_PROXY_ADDRESS} from Data API...")
         url = "https://data-api.polymarket.com/positions"
         params = {"user": POLY_PROXY_ADDRESS, "sizeThreshold": 1} # Only get positions > 1 share
-        response = requests.get(url, params=params, timeout=15)
+        response = http_session.get(url, params=params, timeout=15)
         response.raise_for_status()
         
-        for pos in response.json():
-            positions[pos['conditionId']] = positions.get(pos['conditionId'], {})
-            positions[pos['conditionId']][pos['outcome']] = float(pos['size'])
+        for pos in orjson.loads(response.content):
+            positions.setdefault(pos['conditionId'], {})[pos['outcome']] = float(pos['size'])
         log.info(f"[POLY] Found positions in {len(positions)} markets.")
             
     except Exception as e:
@@ -415,7 +415,9 @@ def process_sell_opportunity(opp: dict):
     log.info(f"--- Processing SELL opportunity {trade_id} for '{market_title}' ---")
     log.info(f"Full sell opportunity details: {json.dumps(opp, indent=2)}")
 
-    trade_log = {'trade_id': trade_id, 'attempt_timestamp_utc': datetime.now(timezone.utc).isoformat(), 'myriad_slug': myriad_slug, 'polymarket_condition_id': poly_id, 'log_details': opp}
+    now_utc = datetime.now(timezone.utc)
+    now_iso = now_utc.isoformat()
+    trade_log = {'trade_id': trade_id, 'attempt_timestamp_utc': now_iso, 'myriad_slug': myriad_slug, 'polymarket_condition_id': poly_id, 'log_details': opp}
     market_key = f"myriad_{myriad_slug}_sell"
 
     try:
@@ -481,7 +483,7 @@ def process_sell_opportunity(opp: dict):
         log.info("--- Performing pre-flight checks for SELL ---")
         if get_abstract_eth_balance() < MIN_ETH_BALANCE: raise ValueError(f"Insufficient gas on Myriad for sell.")
         last_trade_ts = db.get_market_cooldown(market_key)
-        if last_trade_ts and datetime.now(timezone.utc) < (datetime.fromisoformat(last_trade_ts) + timedelta(minutes=TRADE_COOLDOWN_MINUTES)): raise ValueError(f"Market is on sell cooldown.")
+        if last_trade_ts and now_utc < (datetime.fromisoformat(last_trade_ts) + timedelta(minutes=TRADE_COOLDOWN_MINUTES)): raise ValueError(f"Market is on sell cooldown.")
         
         if not m_data_live.get('state') == 'open' or not p_data_live.get('active'):
             raise ValueError("One of the markets is no longer active.")
@@ -512,7 +514,7 @@ def process_sell_opportunity(opp: dict):
         log.info("✅ All Pre-flight checks for SELL passed.")
 
         # STEP 2: EXECUTE SELLS
-        db.update_market_cooldown(market_key, datetime.now(timezone.utc).isoformat())
+        db.update_market_cooldown(market_key, now_iso)
 
         # LEG 1: POLYMARKET SELL
         log.info(f"--- Executing Leg 1 (Polymarket SELL) ---")
@@ -529,7 +531,7 @@ def process_sell_opportunity(opp: dict):
 
         fak_response = poly_result.get('response', {})
         executed_poly_shares_sold, executed_poly_revenue_usd = 0.0, 0.0
-        trade_info_json = json.dumps(fak_response)
+        new_trades = None
         order_id = fak_response.get('orderID')
         status = fak_response.get('status')
 
@@ -549,7 +551,6 @@ def process_sell_opportunity(opp: dict):
                         price = float(mo.get('price', '0'))
                         executed_poly_shares_sold += matched_amount
                         executed_poly_revenue_usd += matched_amount * price
-                trade_info_json = json.dumps(new_trades)
             else:
                 log.error(f"[POLY] CRITICAL: Could not find trade details for sell order {order_id} via polling.")
         else:
@@ -558,6 +559,7 @@ def process_sell_opportunity(opp: dict):
         if executed_poly_shares_sold <= 0:
             raise RuntimeError("Leg 1 (Poly SELL) executed, but no shares were sold.")
         log.info(f"✅ Leg 1 (Poly SELL) SUCCESS: Sold {executed_poly_shares_sold:.4f} shares for ${executed_poly_revenue_usd:.4f} on Polymarket.")
+        trade_info_json = json.dumps(new_trades if new_trades else fak_response)
         trade_log.update({'executed_poly_shares': executed_poly_shares_sold, 'executed_poly_cost_usd': -executed_poly_revenue_usd, 'poly_tx_hash': trade_info_json})
 
         # LEG 2: MYRIAD SELL (WITH RETRY LOGIC)
@@ -634,7 +636,9 @@ def process_opportunity(opp: dict):
     log.info(f"--- Processing opportunity {trade_id} for '{market_title}' ---")
     log.info(f"Full opportunity details: {json.dumps(opp, indent=2)}")
     
-    trade_log = {'trade_id': trade_id, 'attempt_timestamp_utc': datetime.now(timezone.utc).isoformat(), 'myriad_slug': myriad_slug, 'polymarket_condition_id': poly_id, 'log_details': opp}
+    now_utc = datetime.now(timezone.utc)
+    now_iso = now_utc.isoformat()
+    trade_log = {'trade_id': trade_id, 'attempt_timestamp_utc': now_iso, 'myriad_slug': myriad_slug, 'polymarket_condition_id': poly_id, 'log_details': opp}
     market_key = f"myriad_{myriad_slug}"
 
     try:
@@ -659,9 +663,11 @@ def process_opportunity(opp: dict):
         
         reval_myriad_cost = (myriad_model.lmsr_cost(q1_final_live, q2_final_live, b_live) - initial_cost_live) * (1 + market_fee)
         
-        poly_book_live = p_data_live['order_book_yes'] if plan['polymarket_side_to_buy'] == 1 else p_data_live['order_book_no']
-        if opp['market_identifiers']['is_flipped']:
-             poly_book_live = p_data_live['order_book_no'] if plan['polymarket_side_to_buy'] == 1 else p_data_live['order_book_yes']
+        # The producer resolves the flip, so the field always matches the token being bought.
+        book_field = opp['market_identifiers'].get('polymarket_book_field')
+        if not book_field:
+            book_field = 'order_book_yes' if token_id == p_data_live.get('token_id_yes') else 'order_book_no'
+        poly_book_live = p_data_live[book_field]
 
         _, reval_poly_cost, _ = consume_order_book(poly_book_live, plan['polymarket_shares_to_buy'])
         
@@ -687,9 +693,9 @@ def process_opportunity(opp: dict):
         if m_data_live.get('state') != 'open': raise ValueError(f"Myriad market is not 'open'.")
         if not p_data_live.get('active') or p_data_live.get('closed'): raise ValueError(f"Polymarket market is not active/is closed.")
         expiry_dt = datetime.fromisoformat(opp['market_details']['market_expiry_utc'].replace('Z', '+00:00'))
-        if datetime.now(timezone.utc) > (expiry_dt - timedelta(minutes=MARKET_EXPIRY_BUFFER_MINUTES)): raise ValueError(f"Market expires too soon.")
+        if now_utc > (expiry_dt - timedelta(minutes=MARKET_EXPIRY_BUFFER_MINUTES)): raise ValueError(f"Market expires too soon.")
         last_trade_ts = db.get_market_cooldown(market_key)
-        if last_trade_ts and datetime.now(timezone.utc) < (datetime.fromisoformat(last_trade_ts) + timedelta(minutes=TRADE_COOLDOWN_MINUTES)): raise ValueError(f"Market is on cooldown.")
+        if last_trade_ts and now_utc < (datetime.fromisoformat(last_trade_ts) + timedelta(minutes=TRADE_COOLDOWN_MINUTES)): raise ValueError(f"Market is on cooldown.")
         if get_abstract_eth_balance() < MIN_ETH_BALANCE: raise ValueError(f"Insufficient gas on Myriad.")
             
         if EXECUTION_MODE == "LIMITED_LIVE" and plan['estimated_polymarket_cost_usd'] > LIMITED_LIVE_CAP_USD:
@@ -713,7 +719,7 @@ def process_opportunity(opp: dict):
             available_myriad_capital = max(0, myriad_usdc_balance - CAPITAL_SAFETY_BUFFER_USD)
             available_poly_capital = max(0, poly_usdc_balance - CAPITAL_SAFETY_BUFFER_USD)
             q1_i_myr, q2_i_myr = (amm['myriad_q1'], amm['myriad_q2']) if plan['myriad_side_to_buy'] == 1 else (amm['myriad_q2'], amm['myriad_q1'])
-            max_shares_myriad = myriad_model.solve_shares_for_cost(q1_i_myr, q2_i_myr, myriad_b, available_myriad_capital, market_fee)
+            max_shares_myriad = myriad_model.solve_shares_for_cost(round(q1_i_myr, 6), round(q2_i_myr, 6), round(myriad_b, 6), round(available_myriad_capital, 4), round(market_fee, 6))
             max_shares_poly = (available_poly_capital / plan['polymarket_limit_price']) if plan['polymarket_limit_price'] > 0 else 0
             resized_shares = math.floor(min(max_shares_myriad, max_shares_poly))
             if resized_shares < 1: raise ValueError(f"Capital-constrained calculation resulted in < 1 share.")
@@ -733,7 +739,7 @@ def process_opportunity(opp: dict):
 
         # STEP 2: LEG 1 EXECUTION (POLYMARKET)
         log.info("--- Executing Leg 1 (Polymarket) ---")
-        db.update_market_cooldown(market_key, datetime.now(timezone.utc).isoformat())
+        db.update_market_cooldown(market_key, now_iso)
         
         # --- NEW STRATEGY: Use a timestamp to find the trade ---
         timestamp_before_trade = int(time.time()) - 5 # Use a 5-second buffer for clock skew
@@ -744,7 +750,7 @@ def process_opportunity(opp: dict):
         
         fak_response = poly_result.get('response', {})
         executed_poly_shares, executed_poly_cost_usd = 0.0, 0.0
-        trade_info_json = json.dumps(fak_response)
+        new_trades = None
         order_id = fak_response.get('orderID')
         status = fak_response.get('status')
 
@@ -765,7 +771,6 @@ def process_opportunity(opp: dict):
                     for mo in trade.get('maker_orders', []):
                         executed_poly_shares += float(mo.get('matched_amount', '0'))
                         executed_poly_cost_usd += float(mo.get('matched_amount', '0')) * float(mo.get('price', '0'))
-                trade_info_json = json.dumps(new_trades)
             else: 
                 log.error(f"[POLY] CRITICAL: Could not find trade details for order {order_id} via polling.")
         else: # Unlikely case
@@ -773,6 +778,7 @@ def process_opportunity(opp: dict):
             
         if executed_poly_shares <= 0: raise RuntimeError("Leg 1 (Poly) executed but no shares acquired.")
         log.info(f"✅ Leg 1 SUCCESS: Acquired {executed_poly_shares:.4f} shares for ${executed_poly_cost_usd:.4f} on Polymarket.")
+        trade_info_json = json.dumps(new_trades if new_trades else fak_response)
         trade_log.update({'executed_poly_shares': executed_poly_shares, 'executed_poly_cost_usd': executed_poly_cost_usd, 'poly_tx_hash': trade_info_json})
 
         # STEP 3: LEG 2 EXECUTION (MYRIAD)
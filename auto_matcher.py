@@ -1,29 +1,36 @@
 import logging
 import uuid
 import json
+import orjson
 from apscheduler.schedulers.blocking import BlockingScheduler
+from apscheduler.executors.pool import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
 import requests
 import math
+import random
 import time
 import threading
+import functools
+import concurrent.futures
+from eth_utils.abi import collapse_if_tuple
 
-from config import b_client, m_client, p_client, fx_client, notifier, FEE_RATE_BODEGA, myriad_account, myriad_contract, POLYMARKET_PROXY_ADDRESS
+from config import b_client, m_client, p_client, fx_client, notifier, http_session, FEE_RATE_BODEGA, myriad_account, myriad_contract, multicall3_contract, POLYMARKET_PROXY_ADDRESS
 from jobs.fetch_new_bodega import fetch_and_notify_new_bodega
 from jobs.fetch_new_myriad import fetch_and_notify_new_myriad
 from jobs.prune_inactive_pairs import prune_all_inactive_pairs
 from streamlit_app.db import (
-    load_manual_pairs, load_manual_pairs_myriad,
+    load_manual_pairs_myriad,
+    load_active_manual_pairs, load_active_manual_pairs_myriad,
     save_polymarkets,
-    load_probability_watches, delete_probability_watch,
-    get_config_value, save_myriad_markets, load_myriad_markets,
-    add_arb_opportunity, get_market_cooldown, update_market_cooldown,
-    load_bodega_markets
+    load_probability_watches, delete_probability_watches,
+    get_config_values, save_myriad_markets, load_myriad_markets,
+    add_arb_opportunities
 )
 from matching.fuzzy import fetch_all_polymarket_clob_markets
 from services.polymarket.model import build_arbitrage_table, infer_b
 from services.myriad.model import build_arbitrage_table_myriad, calculate_sell_revenue, consume_order_book
 import services.myriad.model as myriad_model
+from services.cache import TTLCache
 
 # Get a logger for this specific module
 log = logging.getLogger(__name__)
@@ -31,25 +38,43 @@ log = logging.getLogger(__name__)
 # --- CACHING (OPTIMIZATION) ---
 _myriad_positions_cache = {}
 _poly_positions_cache = {}
-_ada_usd_price_cache = 0.85  # Initialize with a reasonable fallback
 _myriad_positions_last_updated = 0
 _poly_positions_last_updated = 0
-_ada_usd_price_last_updated = 0
+_scheduled_job_layouts = {}  # platform -> signature of the arb jobs currently scheduled
+_myriad_expiry_ms_cache = {}  # slug -> (expires_at string, parsed epoch ms)
+_myriad_market_data_cache = {}  # slug -> (full_data_json string, parsed market dict)
+# is_flipped -> Polymarket side ('yes'/'no') that hedges Myriad outcome 0 and outcome 1
+MYRIAD_HEDGE_SIDES = {False: ('no', 'yes'), True: ('yes', 'no')}
+MIN_OPPORTUNITY_ROI = 0.02   # Opportunities must beat this ROI...
+MIN_OPPORTUNITY_APY = 2       # ...and this APY (200%), besides the pair's own profit threshold
 POSITION_CACHE_TTL_SECONDS = 60 # Update portfolio positions every 60 seconds
 FX_CACHE_TTL_SECONDS = 60       # Update ADA price every 60 seconds
+ARB_CHECK_MAX_WORKERS = 16      # Pairs checked concurrently per segment (network-bound)
+POSITION_FETCH_MAX_WORKERS = 8  # Concurrent getUserMarketShares eth_calls when refreshing Myriad positions
+POLY_MARKET_MAX_AGE_SECONDS = 10 # Reuse a Polymarket book fetched by another segment within this window
+MYRIAD_MARKETS_CACHE_TTL_SECONDS = 30 # Myriad segments share one slug -> DB row map for this long
+WATCH_PRICES_MAX_AGE_SECONDS = 60 # Probability watches may reuse Bodega prices fetched by the arb check
+SCHEDULER_ARB_WORKERS = 20      # Threads for arb-check segments and other short jobs
+SCHEDULER_BACKGROUND_WORKERS = 4 # Separate threads for slow market-refresh jobs so they never delay arb checks
+# Expected upstream hiccups; logged without a traceback since formatting one per failing pair is costly
+TRANSIENT_ERRORS = (requests.Timeout, requests.ConnectionError, json.JSONDecodeError)
+
+_myriad_market_map_cache = TTLCache(MYRIAD_MARKETS_CACHE_TTL_SECONDS, maxsize=1)  # Holds the slug -> Myriad DB row map
 
 # --- HELPER FUNCTIONS ---
+def new_opportunity_id() -> str:
+    """
+    Returns a time-ordered UUID in the version 7 layout (48-bit ms timestamp, then random bits).
+    Queued opportunities get increasing primary keys, and no os.urandom call is needed per ID.
+    """
+    value = (int(time.time() * 1000) << 80) | random.getrandbits(80)
+    value = (value & ~(0xF << 76)) | (0x7 << 76)  # version 7
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)  # RFC 4122 variant
+    return str(uuid.UUID(int=value))
+
 def get_cached_ada_usd() -> float:
-    """Fetches ADA/USD price from the client, with caching."""
-    global _ada_usd_price_cache, _ada_usd_price_last_updated
-    now = time.time()
-    if now - _ada_usd_price_last_updated > FX_CACHE_TTL_SECONDS:
-        log.info("ADA/USD price cache expired. Fetching fresh data from FX client.")
-        _ada_usd_price_cache = fx_client.get_ada_usd()
-        _ada_usd_price_last_updated = now
-    else:
-        log.info(f"Using cached ADA/USD price: ${_ada_usd_price_cache}")
-    return _ada_usd_price_cache
+    """Fetches ADA/USD price from the client, reusing a rate up to FX_CACHE_TTL_SECONDS old."""
+    return fx_client.get_ada_usd(max_age=FX_CACHE_TTL_SECONDS)
 
 def get_myriad_positions(myriad_market_map: dict) -> dict:
     """ 
@@ -64,24 +89,67 @@ def get_myriad_positions(myriad_market_map: dict) -> dict:
     positions = {}
     manual_pairs = load_manual_pairs_myriad()
     
-    # Create a simple lookup map of slug -> market_id from the pre-fetched data.
-    slug_to_id_map = {slug: data.get('id') for slug, data in myriad_market_map.items() if data.get('id')}
+    # Look up only the paired slugs in the pre-fetched slug -> market map.
+    paired_markets = (myriad_market_map.get(pair[0]) for pair in manual_pairs)
+    market_ids_to_check = {data.get('id') for data in paired_markets if data and data.get('id')}
 
-    market_ids_to_check = {slug_to_id_map.get(pair[0]) for pair in manual_pairs if slug_to_id_map.get(pair[0])}
-
-    for market_id in market_ids_to_check:
+    def fetch_shares(market_id):
         try:
             _liquidity, outcomes = myriad_contract.functions.getUserMarketShares(market_id, myriad_account.address).call()
-            # Shares are scaled by 1e6
-            shares_outcome_0 = outcomes[0] / 1e6
-            shares_outcome_1 = outcomes[1] / 1e6
-            if shares_outcome_0 > 1 or shares_outcome_1 > 1: # Threshold to ignore dust
-                positions[market_id] = {0: shares_outcome_0, 1: shares_outcome_1}
+            return outcomes
         except Exception as e:
             log.error(f"Failed to get Myriad shares for market {market_id}: {e}")
+            return None
+
+    market_ids_to_check = list(market_ids_to_check)
+    all_outcomes = None
+    if multicall3_contract and market_ids_to_check:
+        try:
+            all_outcomes = _fetch_myriad_shares_multicall(market_ids_to_check)
+        except Exception as e:
+            log.warning(f"Multicall for Myriad shares failed, falling back to per-market calls: {e}")
+    if all_outcomes is None:
+        # The eth_calls are independent per market, so run them concurrently.
+        with concurrent.futures.ThreadPoolExecutor(max_workers=POSITION_FETCH_MAX_WORKERS) as executor:
+            all_outcomes = list(executor.map(fetch_shares, market_ids_to_check))
+
+    for market_id, outcomes in zip(market_ids_to_check, all_outcomes):
+        if outcomes is None:
+            continue
+        # Shares are scaled by 1e6
+        shares_outcome_0 = outcomes[0] / 1e6
+        shares_outcome_1 = outcomes[1] / 1e6
+        if shares_outcome_0 > 1 or shares_outcome_1 > 1: # Threshold to ignore dust
+            positions[(market_id, 0)] = shares_outcome_0
+            positions[(market_id, 1)] = shares_outcome_1
     return positions
 
 
+def _fetch_myriad_shares_multicall(market_ids: list) -> list:
+    """
+    Reads getUserMarketShares for every market in one Multicall3 aggregate3 eth_call.
+    Returns the outcome share lists in the order of `market_ids`, with None where the inner call failed.
+    """
+    encode_abi = getattr(myriad_contract, 'encode_abi', None) or myriad_contract.encodeABI  # web3 v7+ / v6
+    calls = [
+        (myriad_contract.address, True, encode_abi('getUserMarketShares', args=[market_id, myriad_account.address]))
+        for market_id in market_ids
+    ]
+    results = multicall3_contract.functions.aggregate3(calls).call()
+    codec = myriad_contract.w3.codec
+    # Decode with the contract's own ABI so a changed signature cannot be decoded with stale types.
+    output_types = [collapse_if_tuple(output) for output in myriad_contract.get_function_by_name('getUserMarketShares').abi['outputs']]
+    all_outcomes = []
+    for market_id, (success, return_data) in zip(market_ids, results):
+        if not success:
+            log.error(f"Failed to get Myriad shares for market {market_id}: call reverted in multicall")
+            all_outcomes.append(None)
+            continue
+        _liquidity, outcomes = codec.decode(output_types, return_data)
+        all_outcomes.append(outcomes)
+    return all_outcomes
+
+
 def get_poly_positions() -> dict:
     """ Fetches current Polymarket positions from the data API. """
     if not POLYMARKET_PROXY_ADDRESS:
@@ -92,20 +160,22 @@ def get_poly_positions() -> dict:
     try:
         url = "https://data-api.polymarket.com/positions"
         params = {"user": POLYMARKET_PROXY_ADDRESS, "sizeThreshold": 1}
-        response = requests.get(url, params=params, timeout=15)
+        response = http_session.get(url, params=params, timeout=15)
         response.raise_for_status()
         
-        for pos in response.json():
-            positions[pos['conditionId']] = positions.get(pos['conditionId'], {})
-            positions[pos['conditionId']][pos['outcome']] = float(pos['size'])
+        for pos in orjson.loads(response.content):
+            positions[(pos['conditionId'], pos['outcome'])] = float(pos['size'])
             
     except Exception as e:
         log.error(f"Failed to fetch Polymarket positions: {e}")
     return positions
 
 
-def calculate_apy(roi: float, end_date_ms: int) -> float:
-    """Calculates APY given ROI and an end date timestamp in milliseconds."""
+def calculate_apy(roi: float, end_date_ms: int, now_ms: float = None) -> float:
+    """
+    Calculates APY given ROI and an end date timestamp in milliseconds.
+    Pass `now_ms` to evaluate many summaries against one snapshot of the clock.
+    """
     try:
         end_date_ms = int(end_date_ms)
     except (ValueError, TypeError):
@@ -114,11 +184,9 @@ def calculate_apy(roi: float, end_date_ms: int) -> float:
     if not end_date_ms or roi <= 0:
         return 0.0
 
-    now_utc = datetime.now(timezone.utc)
-    end_date_utc = datetime.fromtimestamp(end_date_ms / 1000, tz=timezone.utc)
-    
-    time_to_expiry = end_date_utc - now_utc
-    days_to_expiry = time_to_expiry.total_seconds() / (24 * 3600)
+    if now_ms is None:
+        now_ms = time.time() * 1000
+    days_to_expiry = (end_date_ms - now_ms) / 86_400_000
 
     if days_to_expiry <= 0.01:
         return 0.0
@@ -142,6 +210,7 @@ def fetch_and_save_markets():
         fresh_myriad_markets = m_client.fetch_markets()
         if fresh_myriad_markets:
             save_myriad_markets(fresh_myriad_markets)
+            _myriad_market_map_cache.clear()
             log.info(f"Saved/updated {len(fresh_myriad_markets)} Myriad markets (with fees).")
         else:
             log.info("No active Myriad markets found from API.")
@@ -150,113 +219,398 @@ def fetch_and_save_markets():
         log.error(f"Failed to fetch and save all markets: {e}", exc_info=True)
 
 
+def get_myriad_market_map() -> dict:
+    """
+    Returns the Myriad DB snapshot keyed by slug, shared by all Myriad segments.
+    Rebuilt at most every MYRIAD_MARKETS_CACHE_TTL_SECONDS, or right after the snapshot is refreshed.
+    """
+    market_map = _myriad_market_map_cache.get("markets")
+    if market_map is None:
+        market_map = {m['slug']: m for m in load_myriad_markets()}
+        _myriad_market_map_cache.set("markets", market_map)
+    return market_map
+
+def prefetch_poly_markets(pairs: list) -> dict:
+    """Fetches every distinct Polymarket market referenced by `pairs` in one bulk request, keyed by condition ID."""
+    try:
+        return p_client.fetch_markets_bulk([pair[1] for pair in pairs], max_age=POLY_MARKET_MAX_AGE_SECONDS)
+    except TRANSIENT_ERRORS as e:
+        log.warning("Failed to fetch Polymarket markets: %s", e)
+        return {}
+    except Exception as e:
+        log.error("Failed to fetch Polymarket markets: %s", e, exc_info=True)
+        return {}
+
+def _check_bodega_pair(pair: tuple, bodega_market_map: dict, ada_usd: float, poly_markets: dict, bodega_prices: dict, now_ms: float) -> list:
+    """Checks a single Bodega-Polymarket pair against prefetched data and returns any opportunities found."""
+    b_id, p_id, is_flipped, profit_threshold, end_date_override = pair
+    opportunities = []
+    try:
+        profit_threshold = float(profit_threshold)
+        
+        log.debug("--- Checking Bodega Pair: ID=%s, Poly ID=%s ---", b_id, p_id)
+        
+        pool = bodega_market_map.get(b_id)
+        if not pool:
+            log.warning("Skipping pair (%s, %s) because Bodega market config was not found.", b_id, p_id)
+            return []
+        
+        p_data = poly_markets.get(p_id)
+
+        if not p_data or not p_data.get('active') or p_data.get('closed'):
+            log.warning("Skipping pair (%s, %s) because Polymarket market is not active.", b_id, p_id)
+            return []
+        
+        market_end_date_ms = pool.get('deadline')
+        final_end_date_ms = end_date_override if end_date_override else market_end_date_ms
+
+        bodega_prediction_info = bodega_prices.get(b_id)
+        order_book_yes, order_book_no = p_data.get('order_book_yes'), p_data.get('order_book_no')
+        poly_outcome_name_yes, poly_outcome_name_no = p_data.get('outcome_yes', 'YES'), p_data.get('outcome_no', 'NO')
+
+        if is_flipped:
+            order_book_yes, order_book_no = order_book_no, order_book_yes
+            poly_outcome_name_yes, poly_outcome_name_no = poly_outcome_name_no, poly_outcome_name_yes
+
+        if not all([p_data, bodega_prediction_info, order_book_yes, order_book_no]):
+            log.warning("Skipping pair (%s, %s) due to missing data.", b_id, p_id)
+            return []
+
+        Q_YES, Q_NO = bodega_prediction_info.get("yesVolume_ada", 0), bodega_prediction_info.get("noVolume_ada", 0)
+        p_bod_yes = bodega_prediction_info.get("yesPrice_ada")
+        if p_bod_yes is None: return []
+
+        # Top-of-book probe: both sides only get more expensive with size, so if the
+        # first share cannot pay for itself in either direction, skip the full sweep.
+        if p_bod_yes * (1 + FEE_RATE_BODEGA) + order_book_no[0][0] >= 1 and \
+           (1 - p_bod_yes) * (1 + FEE_RATE_BODEGA) + order_book_yes[0][0] >= 1:
+            log.debug("No top-of-book edge for pair (%s, %s). Skipping arbitrage table.", b_id, p_id)
+            return []
+
+        inferred_B = infer_b(Q_YES, Q_NO, p_bod_yes)
+        pair_opportunities = build_arbitrage_table(Q_YES, Q_NO, order_book_yes, order_book_no, ada_usd, FEE_RATE_BODEGA, inferred_B)
+        
+        for summary in pair_opportunities:
+            # Cheap profit/ROI checks first; APY is only needed for the survivors.
+            roi = summary.get("roi", 0)
+            if summary.get("profit_usd", 0) <= profit_threshold or roi <= MIN_OPPORTUNITY_ROI:
+                continue
+            apy = summary['apy'] = calculate_apy(roi, final_end_date_ms, now_ms)
+
+            if apy >= MIN_OPPORTUNITY_APY:
+                summary['polymarket_side'] = poly_outcome_name_yes if summary['polymarket_side'] == 'YES' else poly_outcome_name_no
+                opportunities.append((f"{pool['name']} <-> {p_data['question']}", summary, b_id, p_id))
+
+    except TRANSIENT_ERRORS as e:
+        log.warning("Bodega arb check for pair (%s, %s) failed: %s", b_id, p_id, e)
+    except Exception as e:
+        log.error("Bodega arb check for pair (%s, %s) failed: %s", b_id, p_id, e, exc_info=True)
+    return opportunities
+
 def run_bodega_arb_check(pairs_to_check: list):
     """Checks for arbitrage opportunities in a given list of Bodega-Polymarket pairs."""
-    log.info(f"--- Running BODEGA arbitrage-check job for {len(pairs_to_check)} pairs ---")
+    log.info("--- Running BODEGA arbitrage-check job for %s pairs ---", len(pairs_to_check))
     try:
-        ada_usd = get_cached_ada_usd() # Use cached price
         opportunities = []
 
         if not pairs_to_check:
             log.info("No Bodega pairs in this segment to check. Skipping.")
             return
 
+        ada_usd = get_cached_ada_usd() # Use cached price
+
         try:
-            all_bodega_markets = b_client.fetch_markets()
-            bodega_market_map = {m['id']: m for m in all_bodega_markets}
-            log.info(f"Fetched {len(bodega_market_map)} active Bodega market configs for segment check.")
+            bodega_market_map = b_client.fetch_market_configs([pair[0] for pair in pairs_to_check])
+            log.info("Fetched %s active Bodega market configs for segment check.", len(bodega_market_map))
         except Exception as e:
-            log.error(f"Failed to fetch Bodega market configs: {e}. Aborting Bodega arb check for this segment.")
+            log.error("Failed to fetch Bodega market configs: %s. Aborting Bodega arb check for this segment.", e)
             return
 
-        for b_id, p_id, is_flipped, profit_threshold, end_date_override in pairs_to_check:
-            try:
-                profit_threshold = float(profit_threshold)
-                
-                log.info(f"--- Checking Bodega Pair: ID={b_id}, Poly ID={p_id} ---")
-                
-                pool = bodega_market_map.get(b_id)
-                if not pool:
-                    log.warning(f"Skipping pair ({b_id}, {p_id}) because Bodega market config was not found.")
-                    continue
-                
-                p_data = p_client.fetch_market(p_id)
+        # Phase 1: all network I/O for the segment, done in bulk.
+        poly_markets = prefetch_poly_markets(pairs_to_check)
+        # Several pairs can share a Bodega market, so fetch each market's prices once per segment.
+        bodega_prices = b_client.fetch_prices_many([pair[0] for pair in pairs_to_check if pair[0] in bodega_market_map])
 
-                if not p_data.get('active') or p_data.get('closed'):
-                    log.warning(f"Skipping pair ({b_id}, {p_id}) because Polymarket market is not active.")
-                    continue
-                
-                market_end_date_ms = pool.get('deadline')
-                final_end_date_ms = end_date_override if end_date_override else market_end_date_ms
+        # Phase 2: pure computation on the prefetched data. This is CPU-bound, so worker threads would only add overhead.
+        now_ms = time.time() * 1000
+        for pair in pairs_to_check:
+            opportunities.extend(_check_bodega_pair(pair, bodega_market_map, ada_usd, poly_markets, bodega_prices, now_ms))
 
-                bodega_prediction_info = b_client.fetch_prices(b_id)
-                order_book_yes, order_book_no = p_data.get('order_book_yes'), p_data.get('order_book_no')
-                poly_outcome_name_yes, poly_outcome_name_no = p_data.get('outcome_yes', 'YES'), p_data.get('outcome_no', 'NO')
-
-                if is_flipped:
-                    order_book_yes, order_book_no = order_book_no, order_book_yes
-                    poly_outcome_name_yes, poly_outcome_name_no = poly_outcome_name_no, poly_outcome_name_yes
+        if notifier and opportunities:
+            embeds = [notifier.build_arb_opportunity_embed(pair, summary, b_id, p_id, b_client.api_url) for pair, summary, b_id, p_id in opportunities]
+            notifier.send_batch([e for e in embeds if e])
+        
+        log.info("Bodega arb check for segment finished. Found %s opportunities.", len(opportunities))
 
-                if not all([p_data, bodega_prediction_info, order_book_yes, order_book_no]):
-                    log.warning(f"Skipping pair ({b_id}, {p_id}) due to missing data.")
-                    continue
+    except Exception as e:
+        log.error("Bodega arbitrage check job for segment failed entirely: %s", e, exc_info=True)
 
-                Q_YES, Q_NO = bodega_prediction_info.get("yesVolume_ada", 0), bodega_prediction_info.get("noVolume_ada", 0)
-                p_bod_yes = bodega_prediction_info.get("yesPrice_ada")
-                if p_bod_yes is None: continue
-
-                inferred_B = infer_b(Q_YES, Q_NO, p_bod_yes)
-                pair_opportunities = build_arbitrage_table(Q_YES, Q_NO, order_book_yes, order_book_no, ada_usd, FEE_RATE_BODEGA, inferred_B)
-                
-                for summary in pair_opportunities:
-                    summary['apy'] = calculate_apy(summary.get('roi', 0), final_end_date_ms)
-                    
-                    if summary.get("profit_usd", 0) > profit_threshold and \
-                       summary.get("roi", 0) > 0.02 and \
-                       summary.get("apy", 0) >= 2:
-                        summary['polymarket_side'] = poly_outcome_name_yes if summary['polymarket_side'] == 'YES' else poly_outcome_name_no
-                        pair_desc = f"{pool['name']} <-> {p_data['question']}"
-                        opportunities.append((pair_desc, summary, b_id, p_id))
+def _check_myriad_pair(pair: tuple, myriad_market_map_raw: dict, myriad_positions: dict, poly_positions: dict, poly_markets: dict, now_ms: float,
+                       autotrade_queue: list) -> list:
+    """
+    Checks a single Myriad-Polymarket pair (early exit and BUY) and returns any BUY opportunities found.
+    Queued SELL and autotrade BUY messages are appended to `autotrade_queue` for the caller to write in one batch.
+    """
+    m_slug, p_id, is_flipped, profit_threshold, end_date_override, is_autotrade_safe = pair
+    opportunities = []
+    try:
+        profit_threshold = float(profit_threshold)
 
-            except Exception as e:
-                log.error(f"Bodega arb check for pair ({b_id}, {p_id}) failed: {e}", exc_info=True)
+        m_data_raw = myriad_market_map_raw.get(m_slug)
+        if not m_data_raw or not m_data_raw['full_data_json']:
+            log.warning("Market data for '%s' not found or incomplete in DB cache. Skipping.", m_slug)
+            return []
+        
+        # The stored JSON only changes when the snapshot is refreshed, so it is parsed once per refresh.
+        full_data_json = m_data_raw['full_data_json']
+        cached_data = _myriad_market_data_cache.get(m_slug)
+        if cached_data is not None and cached_data[0] == full_data_json:
+            m_data = cached_data[1]
+        else:
+            m_data = orjson.loads(full_data_json)
+            _myriad_market_data_cache[m_slug] = (full_data_json, m_data)
+
+        if m_data.get('state') != 'open':
+            log.info("Myriad market %s is not 'open', skipping all checks for this pair.", m_slug)
+            _myriad_expiry_ms_cache.pop(m_slug, None)
+            _myriad_market_data_cache.pop(m_slug, None)
+            return []
+
+        p_data = poly_markets.get(p_id)
+        if not p_data:
+            log.warning("Skipping pair (%s, %s) because Polymarket market data could not be fetched.", m_slug, p_id)
+            return []
+
+        myriad_market_id = m_data.get('id')
+        m_prices = None  # Reads the on-chain price, so fetched at most once per pair
+        paired_position = None
+        # Later outcomes win if both legs are held, as before.
+        for myr_outcome, poly_side in enumerate(MYRIAD_HEDGE_SIDES[bool(is_flipped)]):
+            myr_shares = myriad_positions.get((myriad_market_id, myr_outcome), 0)
+            if myr_shares <= 0:
+                continue
+            poly_outcome_name = p_data[f'outcome_{poly_side}']
+            poly_shares = poly_positions.get((p_id, poly_outcome_name), 0)
+            if poly_shares > 0:
+                paired_position = {'myr_outcome': myr_outcome, 'myr_shares': myr_shares, 'poly_outcome_name': poly_outcome_name, 'poly_shares': poly_shares,
+                                   'poly_token': p_data[f'token_id_{poly_side}'], 'poly_book': p_data[f'order_book_{poly_side}_bids']}
+
+        if paired_position:
+            log.info("Hedged position found for pair (%s, %s). Checking for early exit.", m_slug, p_id)
+            min_shares = min(paired_position['myr_shares'], paired_position['poly_shares'])
+            
+            if min_shares < 10:
+                log.info("Skipping SELL check for %s. Position size (%.2f) is below the 10 share threshold.", m_slug, min_shares)
+                return []
+
+            market_fee = m_data.get('fee')
+            if market_fee is None:
+                log.warning("Could not find fee for Myriad market %s during SELL check. Skipping.", m_slug)
+                return []
+            
+            m_prices = m_client.parse_realtime_prices(m_data)
+            if not m_prices:
+                 log.warning("Could not parse real-time prices for Myriad SELL check on %s, skipping.", m_slug)
+                 return []
+            
+            q1, q2, b = m_prices['shares1'], m_prices['shares2'], m_prices['liquidity']
+            q_sell, q_other = (q1, q2) if paired_position['myr_outcome'] == 0 else (q2, q1)
+            
+            # NEW: Find optimal sell amount
+            optimal_s, max_profit, myr_rev_opt, poly_rev_opt = myriad_model.find_optimal_sell_amount(
+                q_sell_initial=q_sell,
+                q_other_initial=q_other,
+                b=b,
+                poly_bids_book=paired_position['poly_book'],
+                max_shares_to_sell=min_shares,
+                fee_rate=market_fee
+            )
+            
+            # Profit check: at least $1 profit AND at least 1.5% ROI
+            if optimal_s > 0 and max_profit > 1.0:
+                roi = max_profit / optimal_s if optimal_s > 0 else 0
+                if roi > 0.01:
+                    log.warning("Found profitable early exit for %s! Optimal to sell %.2f shares for a profit of $%.2f (ROI: %.2f%%).", m_slug, optimal_s, max_profit, roi * 100)
+                    sell_opp = {
+                        "type": "sell", "opportunity_id": new_opportunity_id(), "timestamp_utc": datetime.now(timezone.utc).isoformat(),
+                        "market_identifiers": {"myriad_slug": m_slug, "myriad_market_id": myriad_market_id, "polymarket_condition_id": p_id, "polymarket_token_id_sell": paired_position['poly_token']},
+                        "market_details": {"myriad_title": m_data.get('title'), "market_fee": market_fee},
+                        "trade_plan": {
+                            "myriad_outcome_id_sell": paired_position['myr_outcome'], 
+                            "myriad_shares_to_sell": optimal_s, 
+                            "myriad_min_usd_receive": myr_rev_opt * 0.99, # 1% slippage buffer
+                            "polymarket_shares_to_sell": optimal_s, 
+                            "polymarket_limit_price": paired_position['poly_book'][0][0] if paired_position['poly_book'] else 0.01
+                        },
+                        "profitability_metrics": {"estimated_profit_usd": max_profit, "roi": roi},
+                        "amm_parameters": {"myriad_q1": q1, "myriad_q2": q2, "myriad_liquidity": b}
+                    }
+                    autotrade_queue.append(sell_opp)
+
+        log.debug("--- Checking Myriad Pair: Slug=%s, Poly ID=%s ---", m_slug, p_id)
+
+        if not p_data.get('active') or p_data.get('closed'):
+            log.warning("Skipping BUY check for pair (%s, %s) because Polymarket market is not active.", m_slug, p_id)
+            return []
+        
+        market_expiry_utc = m_data.get("expires_at")
+        final_end_date_ms = None
+        if end_date_override:
+            final_end_date_ms = end_date_override
+        elif market_expiry_utc:
+            cached_expiry = _myriad_expiry_ms_cache.get(m_slug)
+            if cached_expiry and cached_expiry[0] == market_expiry_utc:
+                final_end_date_ms = cached_expiry[1]
+            else:
+                try:
+                    dt_object = datetime.fromisoformat(market_expiry_utc.replace('Z', '+00:00'))
+                    final_end_date_ms = int(dt_object.timestamp() * 1000)
+                    _myriad_expiry_ms_cache[m_slug] = (market_expiry_utc, final_end_date_ms)
+                except (ValueError, TypeError):
+                    log.warning("Could not parse Myriad end date: %s", market_expiry_utc)
+        
+        market_fee = m_data.get('fee')
+        if market_fee is None:
+            log.warning("Fee not found in DB for Myriad market %s, skipping.", m_slug)
+            return []
+
+        if m_prices is None:
+            m_prices = m_client.parse_realtime_prices(m_data)
+        if not m_prices:
+            log.warning("Could not parse real-time prices for Myriad market %s, skipping.", m_slug)
+            return []
+        
+        poly_price_yes = p_data['order_book_yes'][0][0] if p_data.get('order_book_yes') else None
+        poly_price_no = p_data['order_book_no'][0][0] if p_data.get('order_book_no') else None
+        
+        myr_p0_title = m_prices['title1']
+        myr_p1_title = m_prices['title2']
+        poly_p_yes_title = p_data['outcome_yes']
+        poly_p_no_title = p_data['outcome_no']
+
+        if is_flipped:
+            log.debug("PRICES (Flipped): Myriad '%s' @ %.4f vs Poly '%s' @ %s", myr_p0_title, m_prices['price1'], poly_p_no_title, poly_price_no if poly_price_no else 'N/A')
+            log.debug("PRICES (Flipped): Myriad '%s' @ %.4f vs Poly '%s' @ %s", myr_p1_title, m_prices['price2'], poly_p_yes_title, poly_price_yes if poly_price_yes else 'N/A')
+        else:
+            log.debug("PRICES: Myriad '%s' @ %.4f vs Poly '%s' @ %s", myr_p0_title, m_prices['price1'], poly_p_yes_title, poly_price_yes if poly_price_yes else 'N/A')
+            log.debug("PRICES: Myriad '%s' @ %.4f vs Poly '%s' @ %s", myr_p1_title, m_prices['price2'], poly_p_no_title, poly_price_no if poly_price_no else 'N/A')
 
-        if notifier and opportunities:
-            for pair, summary, b_id, p_id in opportunities:
-                notifier.notify_arb_opportunity(pair, summary, b_id, p_id, b_client.api_url)
+        Q1, Q2 = m_prices['shares1'], m_prices['shares2']
+        
+        B_param = m_data.get('liquidity')
+        if not B_param or B_param <= 0:
+            log.warning("Skipping pair for %s due to invalid or missing 'liquidity' parameter: %s", m_slug, B_param)
+            return []
         
-        log.info(f"Bodega arb check for segment finished. Found {len(opportunities)} opportunities.")
+        order_book_poly_1, order_book_poly_2 = p_data.get('order_book_yes'), p_data.get('order_book_no')
+        
+        if is_flipped:
+            order_book_poly_1, order_book_poly_2 = order_book_poly_2, order_book_poly_1
+        
+        # Top-of-book probe: the LMSR price and the ask ladder only rise with size, so if the
+        # first share (with fee) plus the opposite best ask already costs $1 in both directions,
+        # no size can be profitable and the full sweep is skipped.
+        p_myr_1, p_myr_2 = myriad_model.compute_price(Q1, Q2, B_param)
+        top_ask_poly_1 = order_book_poly_1[0][0] if order_book_poly_1 else 1.0
+        top_ask_poly_2 = order_book_poly_2[0][0] if order_book_poly_2 else 1.0
+        if p_myr_1 * (1 + market_fee) + top_ask_poly_2 >= 1 and p_myr_2 * (1 + market_fee) + top_ask_poly_1 >= 1:
+            log.debug("No top-of-book edge for pair (%s, %s). Skipping arbitrage table.", m_slug, p_id)
+            return opportunities
+
+        pair_opportunities = build_arbitrage_table_myriad(Q1, Q2, order_book_poly_1, order_book_poly_2, market_fee, B_param, P1_MYR_REALTIME=m_prices['price1'])
+        # Cheap profit/ROI checks first; APY and the lookup tables below are only needed for the survivors.
+        pair_opportunities = [summary for summary in pair_opportunities
+                              if summary.get("profit_usd", 0) > profit_threshold and summary.get("roi", 0) > MIN_OPPORTUNITY_ROI]
+        if not pair_opportunities:
+            return opportunities
+
+        # Per-pair constants, resolved once rather than for every summary.
+        pair_desc = f"{m_data['title']} <-> {p_data['question']}"
+        book_yes, book_no = p_data.get('order_book_yes'), p_data.get('order_book_no')
+        poly_buy_legs = {  # Polymarket side -> (token ID, limit price) for autotrade
+            1: (p_data.get('token_id_yes'), book_yes[0][0]) if book_yes else (None, None),
+            2: (p_data.get('token_id_no'), book_no[0][0]) if book_no else (None, None),
+        }
+        # Side lookup tables, indexed by the 1-based side numbers used in the summaries.
+        poly_side_map = (None, 2, 1) if is_flipped else (None, 1, 2)
+        poly_titles = (None, p_data['outcome_yes'], p_data['outcome_no'])
+        poly_tops = (None, poly_buy_legs[1][1], poly_buy_legs[2][1])
+        myr_titles = (None, m_prices['title1'], m_prices['title2'])
+        myr_prices = (None, m_prices['price1'], m_prices['price2'])
+
+        for summary in pair_opportunities:
+            apy = summary['apy'] = calculate_apy(summary["roi"], final_end_date_ms, now_ms)
+
+            poly_side = summary['polymarket_side'] = poly_side_map[summary['polymarket_side']]
+
+            if apy >= MIN_OPPORTUNITY_APY:
+                myr_side = summary['myriad_side']
+                summary['myriad_current_price'] = myr_prices[myr_side]
+                summary['poly_current_price'] = poly_tops[poly_side]
+                summary['myriad_side_title'] = myr_titles[myr_side]
+                summary['polymarket_side_title'] = poly_titles[poly_side]
+                opportunities.append((pair_desc, summary, m_slug, p_id))
+
+                if is_autotrade_safe:
+                    try:
+                        polymarket_token_id_buy, polymarket_limit_price = poly_buy_legs[poly_side]
 
+                        if not polymarket_token_id_buy or not polymarket_limit_price:
+                            log.warning("Could not determine Polymarket token ID or limit price for autotrade on %s. Skipping queue.", m_slug)
+                            continue
+
+                        opportunity_message = _build_autotrade_message(
+                            summary, m_slug, m_data, p_id, p_data, polymarket_token_id_buy, polymarket_limit_price,
+                            market_expiry_utc, market_fee, Q1, Q2, B_param, is_flipped
+                        )
+                        autotrade_queue.append(opportunity_message)
+                    except Exception as e:
+                        log.error("Failed to build and queue autotrade opportunity for %s: %s", m_slug, e, exc_info=True)
+    except TRANSIENT_ERRORS as e:
+        log.warning("Myriad arb check for pair (%s, %s) failed: %s", m_slug, p_id, e)
     except Exception as e:
-        log.error(f"Bodega arbitrage check job for segment failed entirely: {e}", exc_info=True)
+        log.error("Myriad arb check for pair (%s, %s) failed: %s", m_slug, p_id, e, exc_info=True)
+    return opportunities
+
+def _build_autotrade_message(summary: dict, m_slug: str, m_data: dict, p_id: str, p_data: dict, polymarket_token_id_buy: str,
+                             polymarket_limit_price: float, market_expiry_utc: str, market_fee: float, Q1: float, Q2: float,
+                             B_param: float, is_flipped) -> dict:
+    """Builds the queued BUY opportunity message consumed by the arb executor."""
+    return {
+        "type": "buy", "opportunity_id": new_opportunity_id(), "timestamp_utc": datetime.now(timezone.utc).isoformat(), "platform": "Myriad",
+        "market_identifiers": {"myriad_slug": m_slug, "myriad_market_id": m_data.get('id'), "polymarket_condition_id": p_id, "polymarket_token_id_buy": polymarket_token_id_buy, "polymarket_book_field": 'order_book_yes' if summary['polymarket_side'] == 1 else 'order_book_no', "is_flipped": bool(is_flipped)},
+        "market_details": {"myriad_title": m_data.get('title'), "polymarket_question": p_data.get('question'), "market_expiry_utc": market_expiry_utc, "market_fee": market_fee},
+        "trade_plan": {"direction": summary.get('direction'), "myriad_side_to_buy": summary.get('myriad_side'), "polymarket_side_to_buy": summary.get('polymarket_side'), "myriad_shares_to_buy": summary.get('myriad_shares'), "estimated_myriad_cost_usd": summary.get('cost_myr_usd'), "polymarket_shares_to_buy": summary.get('polymarket_shares'), "polymarket_limit_price": polymarket_limit_price, "estimated_polymarket_cost_usd": summary.get('cost_poly_usd')},
+        "profitability_metrics": {"estimated_profit_usd": summary.get('profit_usd'), "roi": summary.get('roi'), "apy": summary.get('apy')},
+        "amm_parameters": {"myriad_q1": Q1, "myriad_q2": Q2, "myriad_liquidity": B_param}
+    }
 
 def run_myriad_arb_check(pairs_to_check: list):
     """Checks for arbitrage opportunities in a given list of Myriad-Polymarket pairs."""
     global _myriad_positions_cache, _poly_positions_cache, _myriad_positions_last_updated, _poly_positions_last_updated
 
-    log.info(f"--- Running MYRIAD arbitrage-check job for {len(pairs_to_check)} pairs ---")
+    log.info("--- Running MYRIAD arbitrage-check job for %s pairs ---", len(pairs_to_check))
     try:
         opportunities = []
+        autotrade_queue = []
 
         if not pairs_to_check:
             log.info("No Myriad pairs in this segment to check. Skipping.")
             return
 
-        all_myriad_markets_db = load_myriad_markets()
-        if not all_myriad_markets_db:
+        myriad_market_map_raw = get_myriad_market_map()
+        if not myriad_market_map_raw:
             log.warning("Myriad markets not found in local DB. Run the fetch job or wait for it to run.")
             return
-        myriad_market_map_raw = {m['slug']: m for m in all_myriad_markets_db}
-        log.info(f"Loaded {len(myriad_market_map_raw)} Myriad markets from DB cache for arb check.")
+        log.info("Loaded %s Myriad markets from DB cache for arb check.", len(myriad_market_map_raw))
         
         now = time.time()
         if now - _myriad_positions_last_updated > POSITION_CACHE_TTL_SECONDS:
             log.info("Myriad positions cache expired. Fetching fresh data.")
-            myriad_market_map_simple = {m['slug']: {'id': m['id']} for m in all_myriad_markets_db}
-            _myriad_positions_cache = get_myriad_positions(myriad_market_map_simple)
+            _myriad_positions_cache = get_myriad_positions(myriad_market_map_raw)
             _myriad_positions_last_updated = now
         else:
-            log.info("Using cached Myriad positions.")
+            log.debug("Using cached Myriad positions.")
         myriad_positions = _myriad_positions_cache
 
         if now - _poly_positions_last_updated > POSITION_CACHE_TTL_SECONDS:
@@ -264,199 +618,31 @@ def run_myriad_arb_check(pairs_to_check: list):
             _poly_positions_cache = get_poly_positions()
             _poly_positions_last_updated = now
         else:
-            log.info("Using cached Polymarket positions.")
+            log.debug("Using cached Polymarket positions.")
         poly_positions = _poly_positions_cache
         
-        log.info(f"Found {len(myriad_positions)} Myriad market positions and {len(poly_positions)} Polymarket market positions.")
-
-        for m_slug, p_id, is_flipped, profit_threshold, end_date_override, is_autotrade_safe in pairs_to_check:
-            try:
-                profit_threshold = float(profit_threshold)
-
-                m_data_raw = myriad_market_map_raw.get(m_slug)
-                if not m_data_raw or not m_data_raw['full_data_json']:
-                    log.warning(f"Market data for '{m_slug}' not found or incomplete in DB cache. Skipping.")
-                    continue
-                
-                m_data = json.loads(m_data_raw['full_data_json'])
-
-                if m_data.get('state') != 'open':
-                    log.info(f"Myriad market {m_slug} is not 'open', skipping all checks for this pair.")
-                    continue
-
-                myriad_market_id = m_data.get('id')
-                myr_pos = myriad_positions.get(myriad_market_id, {})
-                poly_pos = poly_positions.get(p_id, {})
-
-                if myr_pos and poly_pos:
-                    log.info(f"Positions found for pair ({m_slug}, {p_id}). Checking for early exit.")
-                    p_data_sell = p_client.fetch_market(p_id)
-                    
-                    myr_s0, myr_s1 = myr_pos.get(0, 0), myr_pos.get(1, 0)
-                    poly_s_yes, poly_s_no = poly_pos.get(p_data_sell['outcome_yes'], 0), poly_pos.get(p_data_sell['outcome_no'], 0)
-                    
-                    paired_position = None
-                    if is_flipped:
-                        if myr_s0 > 0 and poly_s_yes > 0: paired_position = {'myr_outcome': 0, 'myr_shares': myr_s0, 'poly_outcome_name': p_data_sell['outcome_yes'], 'poly_shares': poly_s_yes, 'poly_token': p_data_sell['token_id_yes'], 'poly_book': p_data_sell['order_book_yes_bids']}
-                        if myr_s1 > 0 and poly_s_no > 0: paired_position = {'myr_outcome': 1, 'myr_shares': myr_s1, 'poly_outcome_name': p_data_sell['outcome_no'], 'poly_shares': poly_s_no, 'poly_token': p_data_sell['token_id_no'], 'poly_book': p_data_sell['order_book_no_bids']}
-                    else:
-                        if myr_s0 > 0 and poly_s_no > 0: paired_position = {'myr_outcome': 0, 'myr_shares': myr_s0, 'poly_outcome_name': p_data_sell['outcome_no'], 'poly_shares': poly_s_no, 'poly_token': p_data_sell['token_id_no'], 'poly_book': p_data_sell['order_book_no_bids']}
-                        if myr_s1 > 0 and poly_s_yes > 0: paired_position = {'myr_outcome': 1, 'myr_shares': myr_s1, 'poly_outcome_name': p_data_sell['outcome_yes'], 'poly_shares': poly_s_yes, 'poly_token': p_data_sell['token_id_yes'], 'poly_book': p_data_sell['order_book_yes_bids']}
-
-                    if paired_position:
-                        min_shares = min(paired_position['myr_shares'], paired_position['poly_shares'])
-                        
-                        if min_shares < 10:
-                            log.info(f"Skipping SELL check for {m_slug}. Position size ({min_shares:.2f}) is below the 10 share threshold.")
-                            continue
+        log.info("Found %s Myriad and %s Polymarket position legs.", len(myriad_positions), len(poly_positions))
 
-                        market_fee = m_data.get('fee')
-                        if market_fee is None:
-                            log.warning(f"Could not find fee for Myriad market {m_slug} during SELL check. Skipping.")
-                            continue
-                        
-                        m_prices = m_client.parse_realtime_prices(m_data)
-                        if not m_prices:
-                             log.warning(f"Could not parse real-time prices for Myriad SELL check on {m_slug}, skipping.")
-                             continue
-                        
-                        q1, q2, b = m_prices['shares1'], m_prices['shares2'], m_prices['liquidity']
-                        q_sell, q_other = (q1, q2) if paired_position['myr_outcome'] == 0 else (q2, q1)
-                        
-                        # NEW: Find optimal sell amount
-                        optimal_s, max_profit, myr_rev_opt, poly_rev_opt = myriad_model.find_optimal_sell_amount(
-                            q_sell_initial=q_sell,
-                            q_other_initial=q_other,
-                            b=b,
-                            poly_bids_book=paired_position['poly_book'],
-                            max_shares_to_sell=min_shares,
-                            fee_rate=market_fee
-                        )
-                        
-                        # Profit check: at least $1 profit AND at least 1.5% ROI
-                        if optimal_s > 0 and max_profit > 1.0:
-                            roi = max_profit / optimal_s if optimal_s > 0 else 0
-                            if roi > 0.01:
-                                log.warning(f"Found profitable early exit for {m_slug}! Optimal to sell {optimal_s:.2f} shares for a profit of ${max_profit:.2f} (ROI: {roi:.2%}).")
-                                sell_opp = {
-                                    "type": "sell", "opportunity_id": str(uuid.uuid4()), "timestamp_utc": datetime.now(timezone.utc).isoformat(),
-                                    "market_identifiers": {"myriad_slug": m_slug, "myriad_market_id": myriad_market_id, "polymarket_condition_id": p_id, "polymarket_token_id_sell": paired_position['poly_token']},
-                                    "market_details": {"myriad_title": m_data.get('title'), "market_fee": market_fee},
-                                    "trade_plan": {
-                                        "myriad_outcome_id_sell": paired_position['myr_outcome'], 
-                                        "myriad_shares_to_sell": optimal_s, 
-                                        "myriad_min_usd_receive": myr_rev_opt * 0.99, # 1% slippage buffer
-                                        "polymarket_shares_to_sell": optimal_s, 
-                                        "polymarket_limit_price": paired_position['poly_book'][0][0] if paired_position['poly_book'] else 0.01
-                                    },
-                                    "profitability_metrics": {"estimated_profit_usd": max_profit, "roi": roi},
-                                    "amm_parameters": {"myriad_q1": q1, "myriad_q2": q2, "myriad_liquidity": b}
-                                }
-                                add_arb_opportunity(sell_opp)
-
-                log.info(f"--- Checking Myriad Pair: Slug={m_slug}, Poly ID={p_id} ---")
-                
-                p_data = p_client.fetch_market(p_id)
-
-                if not p_data.get('active') or p_data.get('closed'):
-                    log.warning(f"Skipping BUY check for pair ({m_slug}, {p_id}) because Polymarket market is not active.")
-                    continue
-                
-                market_expiry_utc = m_data.get("expires_at")
-                final_end_date_ms = None
-                if end_date_override:
-                    final_end_date_ms = end_date_override
-                elif market_expiry_utc:
-                    try:
-                        dt_object = datetime.fromisoformat(market_expiry_utc.replace('Z', '+00:00'))
-                        final_end_date_ms = int(dt_object.timestamp() * 1000)
-                    except (ValueError, TypeError):
-                        log.warning(f"Could not parse Myriad end date: {market_expiry_utc}")
-                
-                market_fee = m_data.get('fee')
-                if market_fee is None:
-                    log.warning(f"Fee not found in DB for Myriad market {m_slug}, skipping.")
-                    continue
+        poly_markets = prefetch_poly_markets(pairs_to_check)
+        check_pair = functools.partial(_check_myriad_pair, myriad_market_map_raw=myriad_market_map_raw, myriad_positions=myriad_positions, poly_positions=poly_positions, poly_markets=poly_markets, now_ms=time.time() * 1000,
+                                       autotrade_queue=autotrade_queue)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=ARB_CHECK_MAX_WORKERS) as executor:
+            for pair_opportunities in executor.map(check_pair, pairs_to_check):
+                opportunities.extend(pair_opportunities)
 
-                m_prices = m_client.parse_realtime_prices(m_data)
-                if not m_prices:
-                    log.warning(f"Could not parse real-time prices for Myriad market {m_slug}, skipping.")
-                    continue
-                
-                poly_price_yes = p_data['order_book_yes'][0][0] if p_data.get('order_book_yes') else None
-                poly_price_no = p_data['order_book_no'][0][0] if p_data.get('order_book_no') else None
-                
-                myr_p0_title = m_prices['title1']
-                myr_p1_title = m_prices['title2']
-                poly_p_yes_title = p_data['outcome_yes']
-                poly_p_no_title = p_data['outcome_no']
-
-                if is_flipped:
-                    log.info(f"PRICES (Flipped): Myriad '{myr_p0_title}' @ {m_prices['price1']:.4f} vs Poly '{poly_p_no_title}' @ {poly_price_no if poly_price_no else 'N/A'}")
-                    log.info(f"PRICES (Flipped): Myriad '{myr_p1_title}' @ {m_prices['price2']:.4f} vs Poly '{poly_p_yes_title}' @ {poly_price_yes if poly_price_yes else 'N/A'}")
-                else:
-                    log.info(f"PRICES: Myriad '{myr_p0_title}' @ {m_prices['price1']:.4f} vs Poly '{poly_p_yes_title}' @ {poly_price_yes if poly_price_yes else 'N/A'}")
-                    log.info(f"PRICES: Myriad '{myr_p1_title}' @ {m_prices['price2']:.4f} vs Poly '{poly_p_no_title}' @ {poly_price_no if poly_price_no else 'N/A'}")
-
-                Q1, Q2 = m_prices['shares1'], m_prices['shares2']
-                
-                B_param = m_data.get('liquidity')
-                if not B_param or B_param <= 0:
-                    log.warning(f"Skipping pair for {m_slug} due to invalid or missing 'liquidity' parameter: {B_param}")
-                    continue
-                
-                order_book_poly_1, order_book_poly_2 = p_data.get('order_book_yes'), p_data.get('order_book_no')
-                
-                if is_flipped:
-                    order_book_poly_1, order_book_poly_2 = order_book_poly_2, order_book_poly_1
-                
-                pair_opportunities = build_arbitrage_table_myriad(Q1, Q2, order_book_poly_1, order_book_poly_2, market_fee, B_param, P1_MYR_REALTIME=m_prices['price1'])
-
-                for summary in pair_opportunities:
-                    summary['apy'] = calculate_apy(summary.get('roi', 0), final_end_date_ms)
-                    
-                    if is_flipped:
-                        summary['polymarket_side'] = 2 if summary['polymarket_side'] == 1 else 1
-
-                    if summary.get("profit_usd", 0) > profit_threshold and summary.get("roi", 0) > 0.02 and summary.get("apy", 0) >= 2:
-                        summary['myriad_current_price'] = m_prices['price1'] if summary['myriad_side'] == 1 else m_prices['price2']
-                        summary['poly_current_price'] = (order_book_poly_1[0][0] if summary['polymarket_side'] == 1 and order_book_poly_1 else (order_book_poly_2[0][0] if summary['polymarket_side'] == 2 and order_book_poly_2 else None))
-                        summary['myriad_side_title'] = m_prices['title1'] if summary['myriad_side'] == 1 else m_prices['title2']
-                        summary['polymarket_side_title'] = p_data['outcome_yes'] if summary['polymarket_side'] == 1 else p_data['outcome_no']
-                        pair_desc = f"{m_data['title']} <-> {p_data['question']}"
-                        opportunities.append((pair_desc, summary, m_slug, p_id))
-
-                        if is_autotrade_safe:
-                            try:
-                                polymarket_token_id_buy = (p_data.get('token_id_yes') if summary['polymarket_side'] == 1 and p_data.get('order_book_yes') else (p_data.get('token_id_no') if summary['polymarket_side'] == 2 and p_data.get('order_book_no') else None))
-                                polymarket_limit_price = (p_data['order_book_yes'][0][0] if summary['polymarket_side'] == 1 and p_data.get('order_book_yes') else (p_data['order_book_no'][0][0] if summary['polymarket_side'] == 2 and p_data.get('order_book_no') else None))
-
-                                if not polymarket_token_id_buy or not polymarket_limit_price:
-                                    log.warning(f"Could not determine Polymarket token ID or limit price for autotrade on {m_slug}. Skipping queue.")
-                                    continue
-
-                                opportunity_message = {
-                                    "type": "buy", "opportunity_id": str(uuid.uuid4()), "timestamp_utc": datetime.now(timezone.utc).isoformat(), "platform": "Myriad",
-                                    "market_identifiers": {"myriad_slug": m_slug, "myriad_market_id": m_data.get('id'), "polymarket_condition_id": p_id, "polymarket_token_id_buy": polymarket_token_id_buy, "is_flipped": bool(is_flipped)},
-                                    "market_details": {"myriad_title": m_data.get('title'), "polymarket_question": p_data.get('question'), "market_expiry_utc": market_expiry_utc, "market_fee": market_fee},
-                                    "trade_plan": {"direction": summary.get('direction'), "myriad_side_to_buy": summary.get('myriad_side'), "polymarket_side_to_buy": summary.get('polymarket_side'), "myriad_shares_to_buy": summary.get('myriad_shares'), "estimated_myriad_cost_usd": summary.get('cost_myr_usd'), "polymarket_shares_to_buy": summary.get('polymarket_shares'), "polymarket_limit_price": polymarket_limit_price, "estimated_polymarket_cost_usd": summary.get('cost_poly_usd')},
-                                    "profitability_metrics": {"estimated_profit_usd": summary.get('profit_usd'), "roi": summary.get('roi'), "apy": summary.get('apy')},
-                                    "amm_parameters": {"myriad_q1": Q1, "myriad_q2": Q2, "myriad_liquidity": B_param}
-                                }
-                                add_arb_opportunity(opportunity_message)
-                            except Exception as e:
-                                log.error(f"Failed to build and queue autotrade opportunity for {m_slug}: {e}", exc_info=True)
-            except Exception as e:
-                log.error(f"Myriad arb check for pair ({m_slug}, {p_id}) failed: {e}", exc_info=True)
+        try:
+            add_arb_opportunities(autotrade_queue)
+        except Exception as e:
+            log.error("Failed to queue %s autotrade opportunities: %s", len(autotrade_queue), e, exc_info=True)
 
         if notifier and opportunities:
-            for pair, summary, m_slug, p_id in opportunities:
-                notifier.notify_arb_opportunity_myriad(pair, summary, m_slug, p_id)
+            embeds = [notifier.build_arb_opportunity_myriad_embed(pair, summary, m_slug, p_id) for pair, summary, m_slug, p_id in opportunities]
+            notifier.send_batch([e for e in embeds if e])
         
-        log.info(f"Myriad arb check for segment finished. Found {len(opportunities)} BUY opportunities.")
+        log.info("Myriad arb check for segment finished. Found %s BUY opportunities.", len(opportunities))
 
     except Exception as e:
-        log.error(f"Myriad arbitrage check job for segment failed entirely: {e}", exc_info=True)
+        log.error("Myriad arbitrage check job for segment failed entirely: %s", e, exc_info=True)
 
 
 def run_prob_watch_check():
@@ -468,29 +654,47 @@ def run_prob_watch_check():
             log.info("No probability watches configured. Skipping check.")
             return
 
+        # Prices are fetched concurrently (or reused from a recent arb check); market configs only
+        # for the watches that deviate, in one lookup.
+        all_prices = b_client.fetch_prices_many([watch['bodega_id'] for watch in watches], max_age=WATCH_PRICES_MAX_AGE_SECONDS)
+
+        deviations = []
         for watch in watches:
+            prices = all_prices.get(watch['bodega_id'])
+            if prices is None: continue
+            live_prob = prices.get('yesPrice_ada')
+            if live_prob is None: continue
+
+            deviation = abs(live_prob - watch['expected_probability'])
+            if deviation >= watch['deviation_threshold']:
+                deviations.append((watch, live_prob, deviation))
+        if not deviations:
+            return
+
+        market_configs = b_client.fetch_market_configs([watch['bodega_id'] for watch, _, _ in deviations])
+        to_prune = []
+        for watch, live_prob, deviation in deviations:
             b_id = watch['bodega_id']
             try:
-                prices = b_client.fetch_prices(b_id)
-                live_prob = prices.get('yesPrice_ada')
-                if live_prob is None: continue
-
-                deviation = abs(live_prob - watch['expected_probability'])
-                if deviation >= watch['deviation_threshold']:
-                    market_config = b_client.fetch_market_config(b_id)
-                    if notifier:
-                        notifier.notify_probability_deviation(
-                            market_name=market_config.get('name', f"ID: {b_id}"), bodega_id=b_id,
-                            bodega_api_base=b_client.api_url, expected_prob=watch['expected_probability'],
-                            live_prob=live_prob, deviation=deviation
-                        )
-            except ValueError:
-                log.warning(f"Market {b_id} for probability watch is inactive. Pruning watch.")
-                delete_probability_watch(b_id)
+                market_config = market_configs.get(b_id)
+                if market_config is None:
+                    log.warning("Market %s for probability watch is inactive. Pruning watch.", b_id)
+                    to_prune.append(b_id)
+                    continue
+                if notifier:
+                    notifier.notify_probability_deviation(
+                        market_name=market_config.get('name', f"ID: {b_id}"), bodega_id=b_id,
+                        bodega_api_base=b_client.api_url, expected_prob=watch['expected_probability'],
+                        live_prob=live_prob, deviation=deviation
+                    )
             except Exception as e:
-                log.error(f"Prob watch for Bodega ID {b_id} failed: {e}", exc_info=True)
+                log.error("Prob watch for Bodega ID %s failed: %s", b_id, e, exc_info=True)
+        if to_prune:
+            delete_probability_watches(to_prune)
+    except TRANSIENT_ERRORS as e:
+        log.warning("Probability watch job failed: %s", e)
     except Exception as e:
-        log.error(f"Probability watch job failed entirely: {e}", exc_info=True)
+        log.error("Probability watch job failed entirely: %s", e, exc_info=True)
 
 def setup_market_check_jobs(scheduler, platform: str):
     """
@@ -499,39 +703,35 @@ def setup_market_check_jobs(scheduler, platform: str):
     platform_lower = platform.lower()
     log.info(f"Setting up new scheduler jobs for {platform.upper()}...")
 
-    for job in scheduler.get_jobs():
-        if job.id.startswith(f"{platform_lower}_arb_check_job_"):
-            scheduler.remove_job(job.id)
-
+    # Closed/expired markets are filtered out in SQL, using the DB cache the background job keeps updated.
     if platform_lower == 'myriad':
-        all_pairs = load_manual_pairs_myriad()
-        market_data = {m['slug']: m for m in load_myriad_markets()}
+        active_pairs = load_active_manual_pairs_myriad()
         check_function = run_myriad_arb_check
     elif platform_lower == 'bodega':
-        all_pairs = load_manual_pairs()
-        # --- CHANGE: Use DB cache for speed, background job will update it ---
-        market_data = {m['id']: m for m in load_bodega_markets()}
+        active_pairs = load_active_manual_pairs()
         check_function = run_bodega_arb_check
     else:
         return
 
-    if not all_pairs:
-        log.info(f"No manual pairs found for {platform.upper()}. No jobs scheduled.")
+    if not active_pairs:
+        log.info(f"No active manual pairs found for {platform.upper()}. No jobs scheduled.")
+        _replace_arb_jobs(scheduler, platform_lower, [])
         return
 
-    hp_threshold_hours = float(get_config_value(f'{platform_lower}_high_priority_threshold_hours', '10'))
+    config_keys = [f'{platform_lower}_high_priority_threshold_hours'] + [
+        f'{platform_lower}_{tier}_{setting}' for tier in ('high_priority', 'normal_priority') for setting in ('segments', 'interval_seconds')
+    ]
+    config = get_config_values(config_keys)
+
+    hp_threshold_hours = float(config.get(f'{platform_lower}_high_priority_threshold_hours', '10'))
     priority_cutoff_time = datetime.now(timezone.utc) + timedelta(hours=hp_threshold_hours)
     
     high_priority_pairs = []
     normal_priority_pairs = []
 
-    for pair in all_pairs:
-        market_key = pair[0]
-        data = market_data.get(market_key)
-        if not data: continue
-
-        expires_at_str = data.get('expires_at') if platform_lower == 'myriad' else None
-        deadline_ms = data.get('deadline') if platform_lower == 'bodega' else None
+    for pair, market_end in active_pairs:
+        expires_at_str = market_end if platform_lower == 'myriad' else None
+        deadline_ms = market_end if platform_lower == 'bodega' else None
         market_end_time = None
         try:
             if expires_at_str: market_end_time = datetime.fromisoformat(expires_at_str.replace('Z', '+00:00'))
@@ -546,13 +746,14 @@ def setup_market_check_jobs(scheduler, platform: str):
     log.info(f"[{platform.upper()}] Prioritization complete. High-priority: {len(high_priority_pairs)}, Normal-priority: {len(normal_priority_pairs)}.")
 
     tiers = {'high_priority': high_priority_pairs, 'normal_priority': normal_priority_pairs}
+    jobs = []
 
     for tier_name, pairs in tiers.items():
         if not pairs: continue
         
         is_hp = tier_name == 'high_priority'
-        segments = int(get_config_value(f'{platform_lower}_{tier_name}_segments', '3' if is_hp else '1'))
-        interval = int(get_config_value(f'{platform_lower}_{tier_name}_interval_seconds', '15' if is_hp else '90'))
+        segments = int(config.get(f'{platform_lower}_{tier_name}_segments', '3' if is_hp else '1'))
+        interval = int(config.get(f'{platform_lower}_{tier_name}_interval_seconds', '15' if is_hp else '90'))
         
         # --- SAFETY CHECK: Allow 5-second interval ---
         if segments <= 0 or interval < 5:
@@ -565,12 +766,32 @@ def setup_market_check_jobs(scheduler, platform: str):
         for i, segment_list in enumerate(pair_segments):
             if not segment_list: continue
             job_id = f"{platform_lower}_arb_check_job_{tier_name}_segment_{i}"
-            scheduler.add_job(
-                check_function, "interval", seconds=interval, id=job_id, args=[segment_list],
-                next_run_time=datetime.now(timezone.utc) + timedelta(seconds=i * stagger_delay),
-                misfire_grace_time=30
-            )
-            log.info(f"Scheduled job '{job_id}' ({len(segment_list)} pairs) to run every {interval}s.")
+            jobs.append((job_id, check_function, interval, i * stagger_delay, segment_list))
+
+    _replace_arb_jobs(scheduler, platform_lower, jobs)
+
+def _replace_arb_jobs(scheduler, platform_lower: str, jobs: list):
+    """
+    Replaces the platform's arb-check jobs with `jobs`, unless the same layout is already scheduled.
+    Leaving unchanged jobs alone keeps their run cadence instead of restarting every segment.
+    """
+    signature = tuple((job_id, interval, tuple(map(tuple, segment_list))) for job_id, _, interval, _, segment_list in jobs)
+    if _scheduled_job_layouts.get(platform_lower) == signature and all(scheduler.get_job(job[0]) for job in jobs):
+        log.info(f"[{platform_lower.upper()}] Arb job layout unchanged. Keeping {len(jobs)} existing jobs.")
+        return
+
+    for job in scheduler.get_jobs():
+        if job.id.startswith(f"{platform_lower}_arb_check_job_"):
+            scheduler.remove_job(job.id)
+
+    for job_id, check_function, interval, delay, segment_list in jobs:
+        scheduler.add_job(
+            check_function, "interval", seconds=interval, id=job_id, args=[segment_list],
+            next_run_time=datetime.now(timezone.utc) + timedelta(seconds=delay),
+            coalesce=True, max_instances=1, misfire_grace_time=30
+        )
+        log.info(f"Scheduled job '{job_id}' ({len(segment_list)} pairs) to run every {interval}s.")
+    _scheduled_job_layouts[platform_lower] = signature
 
 def reschedule_all_jobs(scheduler):
     """Periodically re-evaluates market priorities and reschedules all jobs."""
@@ -581,26 +802,39 @@ def reschedule_all_jobs(scheduler):
 
 
 if __name__ == "__main__":
-    sched = BlockingScheduler(timezone="UTC")
+    sched = BlockingScheduler(
+        timezone="UTC",
+        executors={
+            "default": ThreadPoolExecutor(SCHEDULER_ARB_WORKERS),
+            "background": ThreadPoolExecutor(SCHEDULER_BACKGROUND_WORKERS),
+        },
+        # A stalled run must not pile up overlapping or back-to-back catch-up runs.
+        job_defaults={"coalesce": True, "max_instances": 1, "misfire_grace_time": 30}
+    )
 
     def run_initial_jobs():
-        """Runs the slow, blocking jobs in a background thread on startup."""
+        """Runs the slow, blocking jobs concurrently in a background thread on startup."""
         log.info("Running initial startup jobs in background thread...")
-        fetch_and_notify_new_bodega()
-        fetch_and_notify_new_myriad()
-        fetch_and_save_markets()
-        run_prob_watch_check()
-        prune_all_inactive_pairs()
+
+        def detect_new_myriad_then_save_markets():
+            # New-market detection diffs against the saved Myriad snapshot, so it must run before the full save.
+            fetch_and_notify_new_myriad()
+            fetch_and_save_markets()
+
+        startup_jobs = [fetch_and_notify_new_bodega, detect_new_myriad_then_save_markets, run_prob_watch_check, prune_all_inactive_pairs]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(startup_jobs)) as executor:
+            for future in [executor.submit(job) for job in startup_jobs]:
+                future.result()
         log.info("Initial background jobs complete.")
 
     # Start the slow jobs in a background thread so the scheduler can start immediately.
     threading.Thread(target=run_initial_jobs, daemon=True).start()
 
     # Schedule all recurring jobs
-    sched.add_job(fetch_and_notify_new_bodega, "cron", minute="*/15")
-    sched.add_job(fetch_and_notify_new_myriad, "cron", minute="*/15")
-    sched.add_job(fetch_and_save_markets, "cron", minute="*/15")
-    sched.add_job(prune_all_inactive_pairs, "cron", hour="*")
+    sched.add_job(fetch_and_notify_new_bodega, "cron", minute="*/15", executor="background")
+    sched.add_job(fetch_and_notify_new_myriad, "cron", minute="*/15", executor="background")
+    sched.add_job(fetch_and_save_markets, "cron", minute="*/15", executor="background")
+    sched.add_job(prune_all_inactive_pairs, "cron", hour="*", executor="background")
     sched.add_job(run_prob_watch_check, "interval", minutes=3, id="prob_watch_job")
     
     # Schedule arb checks. This is now fast as it only reads from the DB.
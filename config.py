@@ -10,6 +10,7 @@ from services.polymarket.client import PolymarketClient
 from services.myriad.client import MyriadClient
 from services.fx.client import FXClient
 from notifications.discord import DiscordNotifier
+from services.http import create_session
 
 # Load environment variables from .env file
 load_dotenv()
@@ -27,6 +28,8 @@ WEBHOOK_URL = os.getenv("DISCORD_WEBHOOK_URL")
 ABSTRACT_RPC_URL = os.getenv("ABSTRACT_RPC_URL")
 POLYMARKET_PROXY_ADDRESS = os.getenv("POLYMARKET_PROXY_ADDRESS")
 MYRIAD_PRIVATE_KEY = os.getenv("MYRIAD_PRIVATE_KEY")
+# Multicall3 deployment on Abstract mainnet (not the usual 0xcA11... address on this zkSync-based chain)
+MULTICALL3_ADDRESS = os.getenv("MULTICALL3_ADDRESS", "0xAa4De41dba0Ca5dCBb288b7cC6b708F3aaC759E7")
 
 # Fee constants for arbitrage calculation
 FEE_RATE_BODEGA = 0.02  # 4% total fee on Bodega (2% market + 2% protocol)
@@ -35,6 +38,7 @@ FEE_RATE_BODEGA = 0.02  # 4% total fee on Bodega (2% market + 2% protocol)
 # --- Web3 and Myriad Contract Setup ---
 myriad_contract = None
 myriad_account = None
+multicall3_contract = None
 
 if not ABSTRACT_RPC_URL:
     log.warning("ABSTRACT_RPC_URL is not set in .env. Myriad on-chain interactions will be disabled.")
@@ -58,24 +62,33 @@ else:
             address=Web3.to_checksum_address(MYRIAD_MARKET_ADDRESS),
             abi=MYRIAD_MARKET_ABI
         )
+        # Used to batch read-only Myriad calls into a single eth_call
+        MULTICALL3_ABI = json.loads('[{"inputs":[{"components":[{"internalType":"address","name":"target","type":"address"},{"internalType":"bool","name":"allowFailure","type":"bool"},{"internalType":"bytes","name":"callData","type":"bytes"}],"internalType":"struct Multicall3.Call3[]","name":"calls","type":"tuple[]"}],"name":"aggregate3","outputs":[{"components":[{"internalType":"bool","name":"success","type":"bool"},{"internalType":"bytes","name":"returnData","type":"bytes"}],"internalType":"struct Multicall3.Result[]","name":"returnData","type":"tuple[]"}],"stateMutability":"payable","type":"function"}]')
+        multicall3_contract = w3_abs.eth.contract(
+            address=Web3.to_checksum_address(MULTICALL3_ADDRESS),
+            abi=MULTICALL3_ABI
+        )
         log.info("Successfully connected to Abstract RPC and initialized Myriad contract.")
     except Exception as e:
         log.error(f"Failed to initialize Web3 for Abstract, disabling on-chain prices: {e}")
         myriad_contract = None
         myriad_account = None
+        multicall3_contract = None
 
 
 # --- Singleton Clients ---
 # Initializing clients here makes them act as singletons for the application's lifetime.
 log.info("Initializing API clients...")
-b_client = BodegaClient(BODEGA_API)
-p_client = PolymarketClient(POLY_API)
-m_client = MyriadClient(MYRIAD_API, myriad_contract)
-fx_client = FXClient(COIN_API)
+# One keep-alive session shared by every client, so connections are reused across hosts and jobs.
+http_session = create_session()
+b_client = BodegaClient(BODEGA_API, session=http_session)
+p_client = PolymarketClient(POLY_API, session=http_session)
+m_client = MyriadClient(MYRIAD_API, myriad_contract, session=http_session)
+fx_client = FXClient(COIN_API, session=http_session)
 
 if not WEBHOOK_URL:
     log.warning("DISCORD_WEBHOOK_URL is not set. Discord notifications will be disabled.")
     notifier = None
 else:
-    notifier = DiscordNotifier(WEBHOOK_URL)
+    notifier = DiscordNotifier(WEBHOOK_URL, session=http_session)
 log.info("API clients initialized.")
\ No newline at end of file
@@ -2,9 +2,9 @@ import logging
 from datetime import datetime
 from config import b_client, notifier, BODEGA_API
 from streamlit_app.db import (
-    load_bodega_markets,
+    load_bodega_market_ids,
     save_bodega_markets,
-    add_new_bodega_market
+    add_new_bodega_markets
 )
 
 log = logging.getLogger(__name__)
@@ -13,22 +13,15 @@ def fetch_and_notify_new_bodega():
     log.info("Starting job to fetch new Bodega markets...")
     try:
         # 1) IDs already in main snapshot
-        # BUGFIX: The dicts from load_bodega_markets have the key 'id', not 'market_id'.
-        existing_ids = {m["id"] for m in load_bodega_markets()}
+        existing_ids = load_bodega_market_ids()
 
         # 2) Fetch fresh
-        fresh_markets = b_client.fetch_markets(force_refresh=True)
+        fresh_markets = b_client.fetch_markets()
 
-        new_markets_found = []
         # 3) Detect brand-new markets
-        for m in fresh_markets:
-            if m["id"] not in existing_ids:
-                add_new_bodega_market({
-                    "id":       m["id"],
-                    "name":     m["name"],
-                    "deadline": m["deadline"]
-                })
-                new_markets_found.append(m)
+        new_markets_found = [m for m in fresh_markets if m["id"] not in existing_ids]
+        if new_markets_found:
+            add_new_bodega_markets(new_markets_found)
 
         # 4) Notify about all new markets at once, if any
         if notifier and new_markets_found:
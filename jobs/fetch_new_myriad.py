@@ -3,9 +3,9 @@ import logging
 from datetime import datetime
 from config import m_client, notifier
 from streamlit_app.db import (
-    load_myriad_markets,
+    load_myriad_market_ids,
     save_myriad_markets,
-    add_new_myriad_market
+    add_new_myriad_markets
 )
 
 log = logging.getLogger(__name__)
@@ -14,7 +14,7 @@ def fetch_and_notify_new_myriad():
     log.info("Starting job to fetch new Myriad markets...")
     try:
         # 1) Get IDs already in main snapshot
-        existing_ids = {m["id"] for m in load_myriad_markets()}
+        existing_ids = load_myriad_market_ids()
 
         # 2) Fetch fresh markets from the API
         fresh_markets = m_client.fetch_markets()
@@ -22,18 +22,13 @@ def fetch_and_notify_new_myriad():
             log.info("No active Myriad markets found from API.")
             return
 
-        new_markets_found = []
         # 3) Detect brand-new markets
-        for m in fresh_markets:
-            market_id = m.get("id")
-            if market_id and market_id not in existing_ids:
-                add_new_myriad_market({
-                    "id": market_id,
-                    "slug": m.get("slug"),
-                    "name": m.get("title"),
-                    "expires_at": m.get("expires_at")
-                })
-                new_markets_found.append(m)
+        new_markets_found = [m for m in fresh_markets if m.get("id") and m.get("id") not in existing_ids]
+        if new_markets_found:
+            add_new_myriad_markets([
+                {"id": m.get("id"), "slug": m.get("slug"), "name": m.get("title"), "expires_at": m.get("expires_at")}
+                for m in new_markets_found
+            ])
 
         # 4) Notify about all new markets at once, if any
         if notifier and new_markets_found:
@@ -3,12 +3,17 @@ Market fetchers for Bodega vs Polymarket.
 """
 import time
 import requests
+import orjson
 import logging
 from typing import List, Tuple, Dict
 from datetime import datetime
+from services.http import create_session
 
 log = logging.getLogger(__name__)
 
+# Keep-alive session so the cursor-paginated market listing reuses one connection.
+_session = create_session()
+
 #––– POLYMARKET FETCHER –––
 
 def fetch_all_polymarket_clob_markets(
@@ -26,18 +31,18 @@ def fetch_all_polymarket_clob_markets(
         url = base_url + (f"?next_cursor={cursor}" if cursor else "")
         for attempt in range(max_retries):
             try:
-                resp = requests.get(url, timeout=10)
+                resp = _session.get(url, timeout=10)
                 if resp.status_code == 429:
                     sleep_time = backoff_factor * (2 ** attempt)
                     log.warning(f"Rate limited. Retrying in {sleep_time:.2f} seconds...")
                     time.sleep(sleep_time)
                     continue
                 resp.raise_for_status()
-                data = resp.json()
+                data = orjson.loads(resp.content)
                 results.extend(data.get("data", []))
                 cursor = data.get("next_cursor")
                 break # Success, break retry loop
-            except requests.exceptions.RequestException as e:
+            except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
                 log.error(f"Request to {url} failed on attempt {attempt+1}: {e}")
                 if attempt == max_retries - 1:
                     raise  # Re-raise the exception if all retries fail
@@ -60,9 +65,9 @@ def fetch_bodega_v3_active_markets(api_url: str) -> List[Dict]:
     active_api_markets = []
     try:
         url = f"{api_url}/getMarketConfigs"
-        resp = requests.post(url, json={}, timeout=10)
+        resp = _session.post(url, json={}, timeout=10)
         resp.raise_for_status()
-        configs = resp.json().get("marketConfigs", [])
+        configs = orjson.loads(resp.content).get("marketConfigs", [])
         
         now_ms = int(datetime.utcnow().timestamp() * 1000)
         for m in configs:
@@ -77,7 +82,7 @@ def fetch_bodega_v3_active_markets(api_url: str) -> List[Dict]:
                 "deadline": dl,
                 "options": m.get("options", [])
             })
-    except requests.exceptions.RequestException as e:
+    except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
         log.warning(f"Could not fetch live Bodega markets: {e}. Returning empty list.")
 
     log.info(f"Loaded {len(active_api_markets)} active markets from API.")
@@ -1,34 +1,113 @@
 import requests
 import logging
+import orjson
+import queue
+import threading
+import time
+import atexit
+from typing import Optional
+from services.http import create_session
 
 log = logging.getLogger(__name__)
 
+# Discord webhook limits for a single message.
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+JSON_HEADERS = {"Content-Type": "application/json"}
+# Webhook posts are sent by a background thread, paced to stay under Discord's ~5 requests/s limit.
+SEND_QUEUE_MAXSIZE = 1000
+MIN_POST_INTERVAL_SECONDS = 0.25
+
 class DiscordNotifier:
-    def __init__(self, webhook_url: str):
+    def __init__(self, webhook_url: str, session: requests.Session = None):
+        self.session = session or create_session()
         if not webhook_url or not webhook_url.startswith("https://discord.com/api/webhooks/"):
             log.warning("Invalid or missing Discord webhook URL.")
             self.webhook_url = None
         else:
             self.webhook_url = webhook_url
+        self._queue: "queue.Queue[Optional[dict]]" = queue.Queue(maxsize=SEND_QUEUE_MAXSIZE)
+        self._sender_thread: Optional[threading.Thread] = None
+        self._sender_lock = threading.Lock()
 
-    def send(self, content: str):
+    def _post(self, payload: dict):
         """
-        Send a raw message payload to the Discord webhook.
+        Queues a payload for the sender thread, starting it on first use, so callers never wait on the webhook.
         """
-        if not self.webhook_url:
+        if self._sender_thread is None:
+            with self._sender_lock:
+                if self._sender_thread is None:
+                    self._sender_thread = threading.Thread(target=self._drain, name="discord-sender", daemon=True)
+                    self._sender_thread.start()
+                    atexit.register(self.close)
+        try:
+            self._queue.put_nowait(payload)
+        except queue.Full:
+            log.error("Discord send queue is full; dropping notification.")
+
+    def _drain(self):
+        """Sender thread loop: posts queued payloads in order until the None sentinel arrives."""
+        while True:
+            payload = self._queue.get()
+            try:
+                if payload is None:
+                    return
+                self._post_now(payload)
+                time.sleep(MIN_POST_INTERVAL_SECONDS)
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        """Blocks until every queued notification has been posted."""
+        self._queue.join()
+
+    def close(self, timeout: float = 10):
+        """Posts any queued notifications and stops the sender thread."""
+        if self._sender_thread is None or not self._sender_thread.is_alive():
             return
+        self._queue.put(None)
+        self._sender_thread.join(timeout)
+
+    def _post_now(self, payload: dict):
+        """
+        POST a payload to the Discord webhook, logging any failure.
+        """
         try:
-            payload = {
-                "content": content,
-                "allowed_mentions": {"parse": ["everyone"]}
-            }
-            response = requests.post(self.webhook_url, json=payload, timeout=5)
+            response = self.session.post(self.webhook_url, data=orjson.dumps(payload), headers=JSON_HEADERS, timeout=5)
             response.raise_for_status()
         except requests.exceptions.RequestException as e:
             log.error(f"Failed to send Discord notification: {e}")
         except Exception as e:
             log.error(f"An unexpected error occurred while sending Discord notification: {e}")
 
+    def send(self, content: str):
+        """
+        Send a raw message payload to the Discord webhook.
+        """
+        if not self.webhook_url:
+            return
+        self._post({
+            "content": content,
+            "allowed_mentions": {"parse": ["everyone"]}
+        })
+
+    def send_batch(self, embeds: list, content: str = "@everyone"):
+        """
+        Send many embeds using as few webhook calls as possible.
+        Discord allows up to 10 embeds and 6000 embed characters per message.
+        """
+        if not self.webhook_url or not embeds:
+            return
+        chunk, chunk_chars = [], 0
+        for embed in embeds:
+            embed_chars = len(embed.get("title", "")) + len(embed.get("description", ""))
+            if chunk and (len(chunk) == MAX_EMBEDS_PER_MESSAGE or chunk_chars + embed_chars > MAX_EMBED_CHARS_PER_MESSAGE):
+                self._post({"content": content, "embeds": chunk, "allowed_mentions": {"parse": ["everyone"]}})
+                chunk, chunk_chars = [], 0
+            chunk.append(embed)
+            chunk_chars += embed_chars
+        self._post({"content": content, "embeds": chunk, "allowed_mentions": {"parse": ["everyone"]}})
+
     def notify_manual_pair(self, platform: str, platform_id: str, poly_id: str):
         """Notify when a manual pair is added."""
         content = (f"**Manual Pair Added ({platform.upper()})**\n"
@@ -40,9 +119,20 @@ class DiscordNotifier:
         """
         Notify for each Bodega arbitrage opportunity with a detailed execution and payout plan.
         """
+        message = self.format_arb_opportunity(pair, summary, b_id, p_id, bodega_api_base)
+        if message:
+            self.send(f"@everyone\n{message}")
+
+    def build_arb_opportunity_embed(self, pair: str, summary: dict, b_id: str, p_id: str, bodega_api_base: str):
+        """Returns the Bodega arbitrage message as an embed for send_batch, or None if it should be skipped."""
+        message = self.format_arb_opportunity(pair, summary, b_id, p_id, bodega_api_base)
+        return {"description": message} if message else None
+
+    def format_arb_opportunity(self, pair: str, summary: dict, b_id: str, p_id: str, bodega_api_base: str):
+        """Builds the Bodega arbitrage message text, or returns None if the summary is not profitable."""
         if not summary or summary.get("profit_usd", 0) <= 0:
             log.warning(f"Skipping Bodega arb notification for '{pair}' due to invalid summary.")
-            return
+            return None
         
         profit_usd, profit_ada, roi, apy = summary.get("profit_usd", 0), summary.get("profit_ada", 0), summary.get("roi", 0), summary.get("apy", 0)
         ada_usd_rate, inferred_B = summary.get("ada_usd_rate", 0), summary.get("inferred_B", 0)
@@ -57,8 +147,7 @@ class DiscordNotifier:
         bodega_url = f"{bodega_api_base.replace('/api', '')}/marketDetails?id={b_id}"
         poly_url = f"https://polymarket.com/event/{p_id}"
 
-        content = (
-            f"@everyone\n"
+        return (
             f"🚀 **BODEGA Arbitrage Opportunity** 🚀\n\n"
             f"**Pair:** {pair}\n"
             f"**Profit:** `${profit_usd:.2f} USD` (`₳{profit_ada:.2f}`) | **ROI:** `{roi*100:.2f}%` | **APY:** `{apy*100:.2f}%`\n\n"
@@ -80,13 +169,23 @@ class DiscordNotifier:
             f"----------------------------------------\n\n"
             f"*Parameters: Inferred B=`{inferred_B:.2f}`, ADA/USD=`${ada_usd_rate:.4f}`*"
         )
-        self.send(content)
 
     def notify_arb_opportunity_myriad(self, pair: str, summary: dict, m_slug: str, p_id: str):
         """Notify for each Myriad arbitrage opportunity."""
+        message = self.format_arb_opportunity_myriad(pair, summary, m_slug, p_id)
+        if message:
+            self.send(f"@everyone\n{message}")
+
+    def build_arb_opportunity_myriad_embed(self, pair: str, summary: dict, m_slug: str, p_id: str):
+        """Returns the Myriad arbitrage message as an embed for send_batch, or None if it should be skipped."""
+        message = self.format_arb_opportunity_myriad(pair, summary, m_slug, p_id)
+        return {"description": message} if message else None
+
+    def format_arb_opportunity_myriad(self, pair: str, summary: dict, m_slug: str, p_id: str):
+        """Builds the Myriad arbitrage message text, or returns None if the summary is not profitable."""
         if not summary or summary.get("profit_usd", 0) <= 0:
             log.warning(f"Skipping Myriad arb notification for '{pair}' due to invalid summary.")
-            return
+            return None
 
         profit_usd, roi, apy = summary.get("profit_usd", 0), summary.get("roi", 0), summary.get("apy", 0)
         liquidity_param = summary.get("B", 0)
@@ -107,8 +206,7 @@ class DiscordNotifier:
         myriad_price_str = f"**Current Price:** `${myriad_price:.4f}`\n   - " if myriad_price is not None else ""
         poly_price_str = f"**Current Price:** `${poly_price:.4f}`\n   - " if poly_price is not None else ""
 
-        content = (
-            f"@everyone\n"
+        return (
             f"🚀 **MYRIAD Arbitrage Opportunity** 🚀\n\n"
             f"**Pair:** {pair}\n"
             f"**Profit:** `${profit_usd:.2f} USD` | **ROI:** `{roi*100:.2f}%` | **APY:** `{apy*100:.2f}%`\n\n"
@@ -130,7 +228,6 @@ class DiscordNotifier:
             f"----------------------------------------\n\n"
             f"*Parameters Used: Liquidity (B)=`{liquidity_param:.2f}`*"
         )
-        self.send(content)
 
     def notify_probability_deviation(self, market_name: str, bodega_id: str, bodega_api_base: str, expected_prob: float, live_prob: float, deviation: float):
         """Notify when a Bodega market deviates from its expected probability."""
@@ -2,26 +2,44 @@ import requests
 import logging
 import time
 import json
+import orjson
+import concurrent.futures
 from typing import List, Dict
+from services.cache import TTLCache
+from services.http import create_session
 
 log = logging.getLogger(__name__)
 
+MARKET_CONFIG_TTL_SECONDS = 900 # Upper bound for `max_age` in fetch_markets; configs are static apart from new/closed markets
+MARKET_CONFIG_MIN_REFRESH_SECONDS = 60 # Don't force a refresh for a missing market more often than this
+PRICES_MAX_WORKERS = 16
+PRICES_CACHE_TTL_SECONDS = 60 # Upper bound for `max_age` in fetch_prices_many
+
 class BodegaClient:
-    def __init__(self, api_url: str):
+    def __init__(self, api_url: str, session: requests.Session = None):
         self.api_url = api_url
+        # Pooled keep-alive session, normally shared with the other clients.
+        self.session = session or create_session()
+        self._markets_cache = TTLCache(MARKET_CONFIG_TTL_SECONDS, maxsize=1)
+        self._prices_cache = TTLCache(PRICES_CACHE_TTL_SECONDS)
 
-    def fetch_markets(self, force_refresh: bool = False) -> List[Dict]:
+    def fetch_markets(self, max_age: float = 0) -> List[Dict]:
         """
         Fetch all active Bodega V3 market configurations.
-        The `force_refresh` parameter is ignored as there is no cache.
+        With `max_age` > 0, a list fetched within the last `max_age` seconds may be reused.
         """
+        if max_age > 0:
+            cached = self._markets_cache.get("markets", max_age)
+            if cached is not None:
+                return cached
+
         log.info("Fetching fresh Bodega markets from API.")
         url = f"{self.api_url}/getMarketConfigs"
-        resp = requests.post(url, json={}, timeout=10)
+        resp = self.session.post(url, json={}, timeout=10)
         resp.raise_for_status()
         
         # --- ADD THESE LINES FOR DEBUGGING ---
-        raw_data = resp.json()
+        raw_data = orjson.loads(resp.content)
         #log.info(f"DBG: Raw Bodega API response: {json.dumps(raw_data, indent=2)}")
         # --- END DEBUGGING LINES ---
 
@@ -51,17 +69,30 @@ class BodegaClient:
             m['options'] = std_opts
             active.append(m)
 
+        self._markets_cache.set("markets", active)
         return active
 
     def fetch_market_config(self, market_id: str) -> Dict:
         """
         Retrieve a single Bodega market config by ID from the list of active markets.
         """
-        # This will always fetch fresh data since fetch_markets has no cache
-        for m in self.fetch_markets():
-            if m.get("id") == market_id:
-                return m
-        raise ValueError(f"Market config not found for ID: {market_id}")
+        config = self.fetch_market_configs([market_id]).get(market_id)
+        if config is None:
+            raise ValueError(f"Market config not found for ID: {market_id}")
+        return config
+
+    def fetch_market_configs(self, market_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Retrieve the configs of several Bodega markets, keyed by ID, from the cached market list.
+        If any are missing, the list is refreshed once in case they are newer than the cache,
+        unless the cache was just refreshed (e.g. by a previous lookup miss).
+        Markets that are still not found (inactive or unknown) are omitted.
+        """
+        market_map = {m.get("id"): m for m in self.fetch_markets(max_age=MARKET_CONFIG_TTL_SECONDS)}
+        if any(market_id not in market_map for market_id in market_ids) and \
+           self._markets_cache.get("markets", max_age=MARKET_CONFIG_MIN_REFRESH_SECONDS) is None:
+            market_map = {m.get("id"): m for m in self.fetch_markets()}
+        return {market_id: market_map[market_id] for market_id in market_ids if market_id in market_map}
 
     def fetch_prices(self, market_id: str) -> Dict:
         """
@@ -69,9 +100,9 @@ class BodegaClient:
         Returns ADA-denominated prices & volumes. The 'volumes' are the liquidity shares.
         """
         url = f"{self.api_url}/getPredictionInfo"
-        r = requests.get(url, params={"id": market_id}, timeout=10)
+        r = self.session.get(url, params={"id": market_id}, timeout=10)
         r.raise_for_status()
-        info = r.json().get("predictionInfo", {})
+        info = orjson.loads(r.content).get("predictionInfo", {})
 
         # Convert Lovelace → ADA
         LP = 1_000_000
@@ -85,4 +116,34 @@ class BodegaClient:
             "noPrice_ada":  no_price_ada,
             "yesVolume_ada": yes_vol_ada,
             "noVolume_ada":  no_vol_ada
-        }
\ No newline at end of file
+        }
+
+    def fetch_prices_many(self, market_ids: List[str], max_age: float = 0) -> Dict[str, Dict]:
+        """
+        Fetch prices for many markets concurrently, since the API has no batch endpoint.
+        With `max_age` > 0, prices fetched (e.g. by another job) within the last `max_age` seconds may be reused.
+        Returns a dict of market ID -> prices; markets whose fetch failed are omitted.
+        """
+        def fetch(market_id):
+            try:
+                return self.fetch_prices(market_id)
+            except Exception as e:
+                log.error(f"Failed to fetch Bodega prices for {market_id}: {e}")
+                return None
+
+        results = {}
+        to_fetch = []
+        for market_id in dict.fromkeys(market_ids):
+            cached = self._prices_cache.get(market_id, max_age) if max_age > 0 else None
+            if cached is not None:
+                results[market_id] = cached
+            else:
+                to_fetch.append(market_id)
+
+        if to_fetch:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=PRICES_MAX_WORKERS) as executor:
+                for market_id, prices in zip(to_fetch, executor.map(fetch, to_fetch)):
+                    if prices is not None:
+                        self._prices_cache.set(market_id, prices)
+                        results[market_id] = prices
+        return results
@@ -0,0 +1,36 @@
+import threading
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    Small thread-safe cache whose entries expire after a fixed TTL.
+    Callers can ask for a stricter `max_age` per lookup.
+    """
+    def __init__(self, ttl_seconds: float, maxsize: int = 4096):
+        self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
+        self._data: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, max_age: Optional[float] = None) -> Optional[Any]:
+        """Returns the cached value, or None if it is missing or older than `max_age` (default: the TTL)."""
+        max_age = self.ttl_seconds if max_age is None else min(max_age, self.ttl_seconds)
+        with self._lock:
+            entry = self._data.get(key)
+        if entry is None or time.monotonic() - entry[0] > max_age:
+            return None
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any):
+        with self._lock:
+            if len(self._data) >= self.maxsize and key not in self._data:
+                # Drop the oldest entry; dicts keep insertion order.
+                self._data.pop(next(iter(self._data)))
+            self._data.pop(key, None)
+            self._data[key] = (time.monotonic(), value)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
@@ -1,26 +1,49 @@
 import requests
 import logging
+import orjson
+from services.cache import TTLCache
+from services.http import create_session
 
 log = logging.getLogger(__name__)
 
+PRICE_CACHE_TTL_SECONDS = 300 # Upper bound for `max_age` in get_ada_usd
+FALLBACK_CACHE_TTL_SECONDS = 30 # After a failed fetch, callers passing `max_age` get the fallback for this long
+
 class FXClient:
-    def __init__(self, coingecko_url:str):
+    def __init__(self, coingecko_url:str, session: requests.Session = None):
         self.url = coingecko_url
+        self.session = session or create_session()
         self.fallback_price = 0.85
+        self._price_cache = TTLCache(PRICE_CACHE_TTL_SECONDS, maxsize=1)
+        self._fallback_cache = TTLCache(FALLBACK_CACHE_TTL_SECONDS, maxsize=1)
 
-    def get_ada_usd(self) -> float:
+    def get_ada_usd(self, max_age: float = 0) -> float:
         """
         Fetches the current ADA to USD conversion rate from CoinGecko.
-        Returns a fallback value if the API call fails.
+        With `max_age` > 0, a rate fetched within the last `max_age` seconds may be reused.
+        Returns a fallback value if the API call fails; with `max_age` > 0 the fallback is then reused
+        for up to FALLBACK_CACHE_TTL_SECONDS, so an outage does not cost every caller a retried request.
         """
+        if max_age > 0:
+            cached = self._price_cache.get("ada_usd", max_age)
+            if cached is not None:
+                return cached
+            fallback = self._fallback_cache.get("ada_usd", max_age)
+            if fallback is not None:
+                return fallback
+
         try:
-            r = requests.get(self.url, timeout=5)
+            r = self.session.get(self.url, timeout=5)
             r.raise_for_status()
-            return float(r.json()['cardano']['usd'])
+            price = float(orjson.loads(r.content)['cardano']['usd'])
+            self._price_cache.set("ada_usd", price)
+            self._fallback_cache.clear()
+            return price
         except requests.exceptions.RequestException as e:
             log.error(f"Failed to fetch ADA price from CoinGecko: {e}")
         except (KeyError, ValueError) as e:
             log.error(f"Failed to parse ADA price from CoinGecko response: {e}")
         
         log.warning(f"Returning fallback ADA price: ${self.fallback_price}")
-        return self.fallback_price
\ No newline at end of file
+        self._fallback_cache.set("ada_usd", self.fallback_price)
+        return self.fallback_price
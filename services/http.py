@@ -0,0 +1,26 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+HTTP_POOL_CONNECTIONS = 16 # Distinct hosts kept alive (Bodega, Polymarket, Myriad, CoinGecko, Discord, ...)
+HTTP_POOL_MAXSIZE = 64     # Connections per host, enough for the concurrent arb-check workers
+HTTP_RETRIES = 3
+HTTP_BACKOFF_FACTOR = 0.3
+
+
+def create_session() -> requests.Session:
+    """
+    Creates a keep-alive session with pooled connections and retries on transient 5xx errors.
+    Only idempotent methods are retried, so webhook POSTs are never sent twice.
+    """
+    session = requests.Session()
+    retry = Retry(
+        total=HTTP_RETRIES,
+        backoff_factor=HTTP_BACKOFF_FACTOR,
+        status_forcelist=[500, 502, 503, 504],
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
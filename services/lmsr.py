@@ -0,0 +1,9 @@
+import math
+
+# Scalar math helpers shared by the Bodega (services/polymarket/model.py) and
+# Myriad (services/myriad/model.py) LMSR models.
+
+def logaddexp(x: float, y: float) -> float:
+    """Stable log(exp(x) + exp(y)) for two scalars, without scipy's array overhead."""
+    m = max(x, y)
+    return m + math.log1p(math.exp(-abs(x - y)))
@@ -1,16 +1,20 @@
 import requests
 import logging
 import math
+import orjson
 from typing import List, Dict, Optional
 from web3.contract import Contract
 from .model import compute_price as compute_lmsr_price
+from services.http import create_session
 
 log = logging.getLogger(__name__)
 
 class MyriadClient:
-    def __init__(self, api_url: str, myriad_contract: Optional[Contract]):
+    def __init__(self, api_url: str, myriad_contract: Optional[Contract], session: requests.Session = None):
         self.api_url = api_url
+        self.session = session or create_session()
         self.contract = myriad_contract
+        self._fee_cache: Dict[int, Optional[float]] = {} # Market fees are fixed at creation
 
     def fetch_markets(self) -> List[Dict]:
         """Fetch all active Myriad markets and their on-chain fees."""
@@ -18,9 +22,9 @@ class MyriadClient:
         url = f"{self.api_url}/markets?network_id=274133&state=open&land_ids=myriad-szn2-usdc-v33"
         try:
             # Increased timeout for robustness against slow API responses
-            resp = requests.get(url, timeout=100)
+            resp = self.session.get(url, timeout=100)
             resp.raise_for_status()
-            markets_api = resp.json()
+            markets_api = orjson.loads(resp.content)
             
             markets_with_fees = []
             for m in markets_api:
@@ -28,11 +32,14 @@ class MyriadClient:
                     continue
                 
                 market_id = m.get('id')
-                if self.contract and market_id:
+                if market_id in self._fee_cache:
+                    m['fee'] = self._fee_cache[market_id]
+                elif self.contract and market_id:
                     try:
-                        # Fetch fee only once when refreshing market data
+                        # Fees are fixed, so each market's fee is only read on-chain once
                         fee_scaled = self.contract.functions.getMarketFee(market_id).call()
                         m['fee'] = float(fee_scaled / 10**18)
+                        self._fee_cache[market_id] = m['fee']
                     except Exception as e:
                         log.error(f"Failed to fetch on-chain fee for {m.get('slug')}: {e}. Setting fee to None.")
                         m['fee'] = None
@@ -41,7 +48,7 @@ class MyriadClient:
                 markets_with_fees.append(m)
 
             return markets_with_fees
-        except requests.RequestException as e:
+        except (requests.RequestException, orjson.JSONDecodeError) as e:
             log.error(f"Failed to fetch Myriad markets: {e}")
             raise
 
@@ -50,15 +57,18 @@ class MyriadClient:
         url = f"{self.api_url}/markets/{market_slug}"
         try:
             # Increased timeout for robustness
-            resp = requests.get(url, timeout=20)
+            resp = self.session.get(url, timeout=20)
             resp.raise_for_status()
-            data = resp.json()
+            data = orjson.loads(resp.content)
             
             market_id = data.get('id')
-            if self.contract and market_id:
+            if market_id in self._fee_cache:
+                data['fee'] = self._fee_cache[market_id]
+            elif self.contract and market_id:
                 try:
                     fee_scaled = self.contract.functions.getMarketFee(market_id).call()
                     data['fee'] = float(fee_scaled / 10**18)
+                    self._fee_cache[market_id] = data['fee']
                 except Exception as e:
                     log.error(f"Failed to fetch on-chain fee for {market_slug}: {e}. Setting fee to None.")
                     data['fee'] = None
@@ -66,7 +76,7 @@ class MyriadClient:
                 data['fee'] = None
             
             return data
-        except requests.RequestException as e:
+        except (requests.RequestException, orjson.JSONDecodeError) as e:
             log.error(f"Failed to fetch market details for slug {market_slug}: {e}")
             return None
             
@@ -1,7 +1,10 @@
 import math
 import logging
-from scipy.special import logsumexp
+from functools import lru_cache
+import numpy as np
 from typing import Optional, Tuple, Dict, Any, List
+from services.lmsr import logaddexp
+from services.orderbook import order_book_levels, fill_order_book_many
 
 log = logging.getLogger(__name__)
 
@@ -9,7 +12,7 @@ def compute_price(q1: float, q2: float, b: float) -> Tuple[float, float]:
     """Stable LMSR instantaneous price calculation."""
     if b <= 0: return 0.5, 0.5
     q1_b, q2_b = q1 / b, q2 / b
-    sum_exp = logsumexp([q1_b, q2_b])
+    sum_exp = logaddexp(q1_b, q2_b)
     price1 = math.exp(q1_b - sum_exp)
     price2 = math.exp(q2_b - sum_exp)
     return price1, price2
@@ -17,7 +20,7 @@ def compute_price(q1: float, q2: float, b: float) -> Tuple[float, float]:
 def lmsr_cost(q1: float, q2: float, b: float) -> float:
     """LMSR cost function."""
     if b <= 0: raise ValueError("B parameter must be positive.")
-    return b * logsumexp([q1/b, q2/b])
+    return b * logaddexp(q1/b, q2/b)
 
 def calculate_sell_revenue(q1_initial: float, q2_initial: float, b: float, shares_to_sell: float, fee_rate: float = 0.0) -> float:
     """Calculates the revenue from selling shares, including fees."""
@@ -67,37 +70,35 @@ def find_optimal_sell_amount(
     unique_sorted_steps = sorted(list(set(search_steps)))
 
     if unique_sorted_steps:
-        log.info(f"Searching for optimal sell amount up to {max_shares_to_sell:.2f} shares across {len(unique_sorted_steps)} steps.")
+        log.debug("Searching for optimal sell amount up to %.2f shares across %s steps.", max_shares_to_sell, len(unique_sorted_steps))
     else:
-        log.info(f"No search steps generated for max_shares_to_sell={max_shares_to_sell:.2f}. Bailing.")
+        log.info("No search steps generated for max_shares_to_sell=%.2f. Bailing.", max_shares_to_sell)
         return 0.0, 0.0, 0.0, 0.0
 
 
-    for shares_to_sell_int in unique_sorted_steps:
-        if shares_to_sell_int <= 0:
-            continue
-        
-        shares_to_sell = float(shares_to_sell_int)
-        myr_revenue = calculate_sell_revenue(q_sell_initial, q_other_initial, b, shares_to_sell, fee_rate)
-        # Polymarket book qty is integer
-        _, poly_revenue, _ = consume_order_book(poly_bids_book, shares_to_sell_int)
-        
-        total_revenue = myr_revenue + poly_revenue
-        profit = total_revenue - shares_to_sell
-        
-        if profit > best_profit:
-            best_profit = profit
-            optimal_shares = shares_to_sell
-            optimal_myr_rev = myr_revenue
-            optimal_poly_rev = poly_revenue
+    # Score every step in one vectorized pass instead of a Python loop per step.
+    steps = np.array(unique_sorted_steps, dtype=np.float64)
+    steps = steps[steps > 0]
+    initial_pool_cost = lmsr_cost(q_sell_initial, q_other_initial, b)
+    myr_revenues = (initial_pool_cost - b * np.logaddexp((q_sell_initial - steps) / b, q_other_initial / b)) * (1 - fee_rate)
+    _, poly_revenues = fill_order_book_many(order_book_levels(poly_bids_book or []), steps)
+    profits = myr_revenues + poly_revenues - steps
+
+    if profits.size:
+        best_idx = int(np.argmax(profits))  # First maximum, as the previous strict '>' scan picked
+        best_profit = float(profits[best_idx])
+        optimal_shares = float(steps[best_idx])
+        optimal_myr_rev = float(myr_revenues[best_idx])
+        optimal_poly_rev = float(poly_revenues[best_idx])
 
     if best_profit > 0:
-        log.info(f"Optimal sell found: {optimal_shares:.2f} shares for a profit of ${best_profit:.2f} (MyrRev: ${optimal_myr_rev:.2f}, PolyRev: ${optimal_poly_rev:.2f})")
+        log.info("Optimal sell found: %.2f shares for a profit of $%.2f (MyrRev: $%.2f, PolyRev: $%.2f)", optimal_shares, best_profit, optimal_myr_rev, optimal_poly_rev)
     else:
-        log.info(f"No profitable sell opportunity found. Best option was a loss of ${-best_profit:.2f} at {optimal_shares:.2f} shares.")
+        log.debug("No profitable sell opportunity found. Best option was a loss of $%.2f at %.2f shares.", -best_profit, optimal_shares)
 
     return optimal_shares, best_profit, optimal_myr_rev, optimal_poly_rev
 
+@lru_cache(maxsize=1024)
 def solve_shares_for_cost(
     q1_initial: float, q2_initial: float, b: float,
     max_cost: float, fee_rate: float,
@@ -106,6 +107,7 @@ def solve_shares_for_cost(
     """
     Calculates the maximum number of shares that can be bought for a given maximum cost.
     Uses a binary search algorithm to find the number of shares.
+    Results are memoized, so callers should pass rounded inputs to get cache hits.
     """
     initial_pool_cost = lmsr_cost(q1_initial, q2_initial, b)
     
@@ -262,36 +264,67 @@ def _calculate_trade_outcome_myriad_fixed_shares(
         "p_end": compute_price(q1_myr + shares_to_buy_myriad, q2_myr, b)[0]
     }
 
-def _iterative_search(calculation_func, **kwargs) -> Optional[Dict]:
+def _calculate_trade_scores_myriad(
+    q1_myr: float, q2_myr: float, b: float,
+    order_book_poly: List[Tuple[float, int]],
+    fee_rate: float,
+    initial_cost_myr_usd: float,
+    target_myriad_prices: np.ndarray,
+    book_levels: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+) -> np.ndarray:
     """
-    Performs a memory-efficient two-stage iterative search for the best trade outcome.
+    Vectorized score of `_calculate_trade_outcome_myriad` for an array of target prices.
+    Targets that would yield no outcome score -inf. Pass `book_levels` to reuse precomputed
+    order-book levels across calls.
     """
-    best_outcome = None
-    
-    def update_best(outcome):
-        nonlocal best_outcome
-        if outcome:
-            if best_outcome is None or outcome.get('score', -1e9) > best_outcome.get('score', -1e9):
-                best_outcome = outcome
+    scores = np.full(target_myriad_prices.shape, -np.inf)
+    valid = (target_myriad_prices > 0) & (target_myriad_prices < 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        shares_raw = b * np.log(target_myriad_prices / (1 - target_myriad_prices)) + q2_myr - q1_myr
+    shares = np.round(shares_raw)
+    valid &= (shares_raw > 0) & (shares > 0)
+    if not valid.any():
+        return scores
+
+    shares = shares[valid]
+    cost_myr_pre_fee = b * np.logaddexp((q1_myr + shares) / b, q2_myr / b) - initial_cost_myr_usd
+    total_cost_myr_usd = cost_myr_pre_fee + cost_myr_pre_fee * fee_rate
+    filled_poly, cost_poly_usd = fill_order_book_many(book_levels if book_levels is not None else order_book_levels(order_book_poly), shares)
 
+    total_cost_usd = total_cost_myr_usd + cost_poly_usd
+    profit_usd = np.minimum(shares * 1.0, filled_poly * 1.0) - total_cost_usd
+    with np.errstate(divide='ignore', invalid='ignore'):
+        roi = np.where(total_cost_usd > 0, profit_usd / total_cost_usd, 0.0)
+    score = np.where(profit_usd < 0, profit_usd, roi * profit_usd)
+    score[(filled_poly == 0) | np.isnan(score)] = -np.inf
+    scores[valid] = score
+    return scores
+
+def _iterative_search(calculation_func, score_func, **kwargs) -> Optional[Dict]:
+    """
+    Two-stage search for the best trade outcome.
+    Each stage scores all of its adjustments in one vectorized pass via `score_func`;
+    only the winning adjustment is expanded into a full outcome by `calculation_func`.
+    """
     # Stage 1: Coarse search
-    coarse_adjustments = [i / 100.0 for i in range(0, 51)] # 0.00 to 0.50, step 0.01
-    for adj in coarse_adjustments:
-        outcome = calculation_func(target_adjustment=adj, **kwargs)
-        update_best(outcome)
-            
+    coarse_adjustments = np.arange(0, 51) / 100.0 # 0.00 to 0.50, step 0.01
+    coarse_scores = score_func(coarse_adjustments)
+    best_idx = int(np.argmax(coarse_scores))
+    if coarse_scores[best_idx] == -np.inf:
+        return None
+    best_adj, best_score = float(coarse_adjustments[best_idx]), coarse_scores[best_idx]
+
     # Stage 2: Fine search
-    if best_outcome and best_outcome.get('score', -1) > 0:
-        best_adj_coarse = best_outcome['adjustment']
-        fine_start = max(0, best_adj_coarse - 0.01)
+    if best_score > 0:
+        fine_start = max(0, best_adj - 0.01)
         # Generate 21 steps of 0.001 around the best coarse adjustment
-        fine_adjustments = [fine_start + i * 0.001 for i in range(21)]
-        
-        for adj in fine_adjustments:
-            outcome = calculation_func(target_adjustment=adj, **kwargs)
-            update_best(outcome)
+        fine_adjustments = fine_start + np.arange(21) * 0.001
+        fine_scores = score_func(fine_adjustments)
+        fine_idx = int(np.argmax(fine_scores))
+        if fine_scores[fine_idx] > best_score:
+            best_adj = float(fine_adjustments[fine_idx])
 
-    return best_outcome
+    return calculation_func(target_adjustment=best_adj, **kwargs)
 
 def build_arbitrage_table_myriad(
     Q1_MYR: float, Q2_MYR: float,
@@ -323,7 +356,12 @@ def build_arbitrage_table_myriad(
             'initial_cost_myr_usd': initial_cost_myr_usd
         }
         
-        best_outcome = _iterative_search(calculate_scenario_1, **common_args)
+        book_levels_1 = order_book_levels(ORDER_BOOK_POLY_2)
+
+        def score_scenario_1(adjustments):
+            return _calculate_trade_scores_myriad(target_myriad_prices=implied_poly_1_price - adjustments, book_levels=book_levels_1, **common_args)
+
+        best_outcome = _iterative_search(calculate_scenario_1, score_scenario_1, **common_args)
         
         final_outcome = None
         if best_outcome and best_outcome['profit_usd'] > 0:
@@ -359,7 +397,12 @@ def build_arbitrage_table_myriad(
             'initial_cost_myr_usd': initial_cost_myr_usd
         }
 
-        best_outcome = _iterative_search(calculate_scenario_2, **common_args_s2)
+        book_levels_2 = order_book_levels(ORDER_BOOK_POLY_1)
+
+        def score_scenario_2(adjustments):
+            return _calculate_trade_scores_myriad(target_myriad_prices=implied_poly_2_price - adjustments, book_levels=book_levels_2, **common_args_s2)
+
+        best_outcome = _iterative_search(calculate_scenario_2, score_scenario_2, **common_args_s2)
         
         final_outcome = None
         if best_outcome and best_outcome['profit_usd'] > 0:
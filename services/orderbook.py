@@ -0,0 +1,24 @@
+import numpy as np
+from typing import List, Tuple
+
+# Vectorized order-book helpers shared by the Bodega (services/polymarket/model.py) and
+# Myriad (services/myriad/model.py) arbitrage solvers.
+
+def order_book_levels(ob: List[Tuple[float, int]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Precomputes (prices, cumulative size, cumulative cost) for an order book, for use with fill_order_book_many."""
+    prices = np.array([price for price, _ in ob], dtype=np.float64)
+    sizes = np.array([size for _, size in ob], dtype=np.float64)
+    return prices, np.cumsum(sizes), np.cumsum(prices * sizes)
+
+def fill_order_book_many(levels: Tuple[np.ndarray, np.ndarray, np.ndarray], quantities: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Vector form of consume_order_book: (filled_shares, cost) for each requested quantity."""
+    prices, cum_size, cum_cost = levels
+    if prices.size == 0:
+        return np.zeros_like(quantities), np.zeros_like(quantities)
+    filled = np.minimum(quantities, cum_size[-1])
+    # First level whose cumulative size covers the fill; everything before it is taken whole.
+    idx = np.minimum(np.searchsorted(cum_size, filled, side='left'), prices.size - 1)
+    prev_size = np.where(idx > 0, cum_size[idx - 1], 0.0)
+    prev_cost = np.where(idx > 0, cum_cost[idx - 1], 0.0)
+    cost = prev_cost + prices[idx] * (filled - prev_size)
+    return np.round(filled), cost
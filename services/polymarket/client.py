@@ -1,13 +1,30 @@
 import requests
 import logging
-from typing import List, Dict
-from streamlit_app.db import load_polymarkets
-import json
+from typing import List, Dict, Optional, Tuple
+import concurrent.futures
+from operator import itemgetter
+from streamlit_app.db import search_polymarkets
+from services.cache import TTLCache
+from services.http import create_session
+import orjson
 log = logging.getLogger(__name__)
 
+MARKET_CACHE_TTL_SECONDS = 60 # Upper bound for `max_age` in fetch_market
+BOOKS_BATCH_SIZE = 100 # Token IDs per POST /books request
+METADATA_MAX_WORKERS = 16
+METADATA_CACHE_TTL_SECONDS = 300 # Question, tokens and status change rarely; order books are always fetched fresh
+CLOSED_MARKET_CACHE_TTL_SECONDS = 6 * 3600 # Resolved markets are served without network calls for this long
+CLOSED_MARKET_CACHE_MAXSIZE = 4096
+
 class PolymarketClient:
-    def __init__(self, api_url: str = "https://clob.polymarket.com"):
+    def __init__(self, api_url: str = "https://clob.polymarket.com", session: requests.Session = None):
         self.api_url = api_url
+        # Pooled keep-alive session, normally shared with the other clients.
+        self.session = session or create_session()
+        self._market_cache = TTLCache(MARKET_CACHE_TTL_SECONDS)
+        self._metadata_cache = TTLCache(METADATA_CACHE_TTL_SECONDS)
+        # Resolved markets never reopen, so once the API reports them closed they are served from here.
+        self._closed_markets = TTLCache(CLOSED_MARKET_CACHE_TTL_SECONDS, maxsize=CLOSED_MARKET_CACHE_MAXSIZE)
 
     def fetch_all_markets(self) -> List[Dict]:
         """
@@ -17,57 +34,159 @@ class PolymarketClient:
         log.info("Fetching all Polymarket markets from API.")
         return fetch_all_polymarket_clob_markets()
 
-    def fetch_market(self, condition_id: str) -> Dict:
+    def fetch_market(self, condition_id: str, max_age: float = 0) -> Dict:
         """
         Fetch a single Polymarket market by condition_id.
         This now fetches the full order book (bids and asks) for both outcomes.
+        With `max_age` > 0, a result fetched within the last `max_age` seconds may be reused.
+        Markets already known to be closed are returned without any network calls.
+        """
+        return self.fetch_markets_bulk([condition_id], max_age=max_age)[condition_id]
+
+    def fetch_markets_bulk(self, condition_ids: List[str], max_age: float = 0) -> Dict[str, Dict]:
+        """
+        Fetch many Polymarket markets, keyed by condition_id.
+        Market metadata is fetched per market (concurrently); with `max_age` > 0 it may be reused
+        for up to METADATA_CACHE_TTL_SECONDS, so the default call always sees the current status.
+        The order books of every outcome token are always fetched together through the batch
+        /books endpoint.
         """
+        results = {}
+        to_fetch = []
+        for condition_id in dict.fromkeys(condition_ids):
+            closed_market = self._closed_markets.get(condition_id)
+            if closed_market is not None:
+                results[condition_id] = closed_market
+                continue
+            if max_age > 0:
+                cached = self._market_cache.get(condition_id, max_age)
+                if cached is not None:
+                    results[condition_id] = cached
+                    continue
+            to_fetch.append(condition_id)
+
+        if not to_fetch:
+            return results
+
+        if max_age > 0:
+            metadata = [self._metadata_cache.get(condition_id) for condition_id in to_fetch]
+        else:
+            metadata = [None] * len(to_fetch)
+        missing = [condition_id for condition_id, market_data in zip(to_fetch, metadata) if market_data is None]
+        if len(missing) == 1:
+            fetched = [self._fetch_market_metadata(missing[0])]
+        elif missing:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=min(METADATA_MAX_WORKERS, len(missing))) as executor:
+                fetched = list(executor.map(self._fetch_market_metadata, missing))
+        else:
+            fetched = []
+        fetched_by_id = dict(zip(missing, fetched))
+        for condition_id, market_data in fetched_by_id.items():
+            if market_data is not None:
+                self._metadata_cache.set(condition_id, market_data)
+        metadata = [market_data if market_data is not None else fetched_by_id.get(condition_id)
+                    for condition_id, market_data in zip(to_fetch, metadata)]
+
+        # A closed market has nothing left to trade, so skip its order books.
+        token_ids = []
+        for market_data in metadata:
+            if market_data and market_data.get('closed') is not True:
+                token_ids.extend(t for t in self._outcome_tokens(market_data)[0:2] if t)
+        books = self._fetch_order_books(token_ids)
+
+        for condition_id, market_data in zip(to_fetch, metadata):
+            if market_data is None:
+                results[condition_id] = {'active': False, 'closed': True}
+                continue
+            market = self._build_market(condition_id, market_data, books)
+            # Only an explicit closed flag is trusted; a response without one had its books fetched as open.
+            if market_data.get('closed') is True:
+                self._closed_markets.set(condition_id, market)
+            else:
+                self._market_cache.set(condition_id, market)
+            results[condition_id] = market
+        return results
+
+    def _fetch_market_metadata(self, condition_id: str) -> Optional[Dict]:
+        """GET /markets/{condition_id}. Returns None if the request fails."""
         market_url = f"{self.api_url}/markets/{condition_id}"
         try:
-            market_resp = requests.get(market_url, timeout=10)
+            market_resp = self.session.get(market_url, timeout=10)
             market_resp.raise_for_status()
-            market_data = market_resp.json()
-        except requests.exceptions.RequestException as e:
+            return orjson.loads(market_resp.content)
+        except (requests.exceptions.RequestException, ValueError) as e:
             log.error(f"Failed to fetch market data for {condition_id}: {e}")
-            return {'active': False, 'closed': True}
+            return None
 
+    @staticmethod
+    def _outcome_tokens(market_data: Dict) -> Tuple[Optional[str], Optional[str], str, str]:
+        """Returns (token_id_yes, token_id_no, outcome_yes, outcome_no), putting a 'Yes' outcome first."""
         tokens = market_data.get("tokens", [])
         token_1, token_2 = (tokens[0], tokens[1]) if len(tokens) == 2 else (None, None)
-        if 'Yes' in [t.get('outcome') for t in tokens]:
-             token_1 = next((t for t in tokens if t.get("outcome") == "Yes"), None)
-             token_2 = next((t for t in tokens if t.get("outcome") != "Yes"), None)
-
-        token_1_id_str = token_1.get("token_id") if token_1 else None
-        token_2_id_str = token_2.get("token_id") if token_2 else None
-        
-        outcome_1_name = token_1.get("outcome") if token_1 else "Outcome 1"
-        outcome_2_name = token_2.get("outcome") if token_2 else "Outcome 2"
-
-        order_book_1_asks, order_book_1_bids = [], []
-        order_book_2_asks, order_book_2_bids = [], []
-
-        order_book_url = f"{self.api_url}/book"
-        for i, token_id_str in enumerate([token_1_id_str, token_2_id_str]):
-            if not token_id_str: continue
+        # One pass for the first 'Yes' token and the first other token.
+        yes_token = other_token = None
+        for t in tokens:
+            if t.get("outcome") == "Yes":
+                if yes_token is None:
+                    yes_token = t
+            elif other_token is None:
+                other_token = t
+        if yes_token is not None:
+            token_1, token_2 = yes_token, other_token
+
+        return (
+            token_1.get("token_id") if token_1 else None,
+            token_2.get("token_id") if token_2 else None,
+            token_1.get("outcome") if token_1 else "Outcome 1",
+            token_2.get("outcome") if token_2 else "Outcome 2",
+        )
+
+    @staticmethod
+    def _parse_levels(levels: List[Dict]) -> List[Tuple[float, int]]:
+        """Converts raw string levels to (price, size) tuples, parsing each size only once."""
+        parsed = []
+        for level in levels:
+            size = float(level['size'])
+            if size > 0:
+                parsed.append((float(level['price']), int(size)))
+        return parsed
+
+    @staticmethod
+    def _parse_book(book: Dict) -> Tuple[List[Tuple[float, int]], List[Tuple[float, int]]]:
+        """Returns (asks ascending, bids descending) as (price, size) levels."""
+        asks = sorted(PolymarketClient._parse_levels(book.get("asks", [])), key=itemgetter(0))
+        bids = sorted(PolymarketClient._parse_levels(book.get("bids", [])), key=itemgetter(0), reverse=True)
+        return asks, bids
+
+    def _fetch_order_books(self, token_ids: List[str]) -> Dict[str, Tuple[list, list]]:
+        """
+        Fetch (asks, bids) for many tokens with POST /books, in chunks of BOOKS_BATCH_SIZE.
+        Falls back to one GET /book per token if a batch request fails.
+        """
+        books = {}
+        for i in range(0, len(token_ids), BOOKS_BATCH_SIZE):
+            chunk = token_ids[i:i + BOOKS_BATCH_SIZE]
             try:
-                # Get ASKS (for buying)
-                asks_resp = requests.get(order_book_url, params={"token_id": token_id_str, "side": "sell"}, timeout=5)
-                if asks_resp.status_code == 200:
-                    asks = asks_resp.json().get("asks", [])
-                    book_asks = sorted([(float(ask['price']), int(float(ask['size']))) for ask in asks if float(ask['size']) > 0], key=lambda x: x[0])
-                    if i == 0: order_book_1_asks = book_asks
-                    else: order_book_2_asks = book_asks
-
-                # Get BIDS (for selling)
-                bids_resp = requests.get(order_book_url, params={"token_id": token_id_str, "side": "buy"}, timeout=5)
-                if bids_resp.status_code == 200:
-                    bids = bids_resp.json().get("bids", [])
-                    book_bids = sorted([(float(bid['price']), int(float(bid['size']))) for bid in bids if float(bid['size']) > 0], key=lambda x: x[0], reverse=True)
-                    if i == 0: order_book_1_bids = book_bids
-                    else: order_book_2_bids = book_bids
-            
-            except (requests.exceptions.RequestException, ValueError, TypeError) as e:
-                log.error(f"Failed to fetch or parse order book for token {token_id_str}: {e}")
+                resp = self.session.post(f"{self.api_url}/books", json=[{"token_id": t} for t in chunk], timeout=10)
+                resp.raise_for_status()
+                for book in orjson.loads(resp.content):
+                    books[book.get("asset_id")] = self._parse_book(book)
+            except (requests.exceptions.RequestException, ValueError, TypeError, KeyError) as e:
+                log.warning(f"Batch order book request failed ({e}). Falling back to per-token requests.")
+                for token_id_str in chunk:
+                    try:
+                        book_resp = self.session.get(f"{self.api_url}/book", params={"token_id": token_id_str}, timeout=5)
+                        if book_resp.status_code == 200:
+                            books[token_id_str] = self._parse_book(orjson.loads(book_resp.content))
+                    except (requests.exceptions.RequestException, ValueError, TypeError, KeyError) as e:
+                        log.error(f"Failed to fetch or parse order book for token {token_id_str}: {e}")
+        return books
+
+    def _build_market(self, condition_id: str, market_data: Dict, books: Dict[str, Tuple[list, list]]) -> Dict:
+        """Assembles the market dict used throughout the app from metadata and fetched books."""
+        token_1_id_str, token_2_id_str, outcome_1_name, outcome_2_name = self._outcome_tokens(market_data)
+        order_book_1_asks, order_book_1_bids = books.get(token_1_id_str, ([], []))
+        order_book_2_asks, order_book_2_bids = books.get(token_2_id_str, ([], []))
 
         price_1 = order_book_1_asks[0][0] if order_book_1_asks else None
         price_2 = order_book_2_asks[0][0] if order_book_2_asks else None
@@ -99,6 +218,4 @@ class PolymarketClient:
         """
         if not query:
             return []
-        all_markets = load_polymarkets()
-        q_low = query.lower()
-        return [m for m in all_markets if q_low in m.get('question', '').lower()]
+        return search_polymarkets(query)
@@ -1,17 +1,22 @@
 import math
 import logging
-from scipy.special import logsumexp
+from functools import lru_cache
+import numpy as np
 from typing import Optional, Tuple, Dict, Any, List
+from services.lmsr import logaddexp
+from services.orderbook import order_book_levels, fill_order_book_many
 
 log = logging.getLogger(__name__)
 
 # --- Helper Functions ---
 
+@lru_cache(maxsize=4096)
 def infer_b(q_yes: float, q_no: float, price_yes: float) -> float:
     """
     Infers the B parameter for a Bodega market from its current state.
+    Cached on the exact state, which stays the same between checks until someone trades.
     """
-    log.info(f"DBG: Attempting to infer B with q_yes={q_yes}, q_no={q_no}, price_yes={price_yes}")
+    log.debug("DBG: Attempting to infer B with q_yes=%s, q_no=%s, price_yes=%s", q_yes, q_no, price_yes)
     if not (0.0 < price_yes < 1.0):
         log.warning(f"infer_b check failed: price_yes ({price_yes}) is not strictly between 0 and 1.")
         raise ValueError("price_yes must be strictly between 0 and 1.")
@@ -43,12 +48,12 @@ def compute_price(qy: float, qn: float, b: float) -> float:
     """Stable LMSR instantaneous price."""
     if b == 0: return 1.0 if qy > qn else 0.0 if qn > qy else 0.5
     qy_b, qn_b = qy / b, qn / b
-    return math.exp(qy_b - logsumexp([qy_b, qn_b]))
+    return math.exp(qy_b - logaddexp(qy_b, qn_b))
 
 def lmsr_cost(qy: float, qn: float, b: float) -> float:
     """LMSR cost function."""
     if b == 0: return max(qy, qn)
-    return b * logsumexp([qy/b, qn/b])
+    return b * logaddexp(qy/b, qn/b)
 
 def solve_x_for_price(q1: float, q2: float, p_tgt: float, b: float) -> Optional[float]:
     """Solve x so that compute_price(q1 + x, q2, b) == p_tgt."""
@@ -198,36 +203,75 @@ def _calculate_trade_outcome_fixed_shares(
         "p_end": compute_price(q1_bod + x_bod, q2_bod, b)
     }
 
-def _iterative_search(calculation_func, **kwargs) -> Optional[Dict]:
+def _calculate_trade_scores(
+    q1_bod: float, q2_bod: float, b: float,
+    order_book_poly: List[Tuple[float, int]],
+    ada_to_usd: float, fee_rate: float,
+    initial_cost_bod_ada: float,
+    target_bodega_prices: np.ndarray,
+    book_levels: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+) -> np.ndarray:
     """
-    Performs a memory-efficient search for the best trade outcome.
-    Only tracks the best result found so far, instead of storing all results.
+    Vectorized score of `_calculate_trade_outcome` for an array of target prices.
+    Targets that would yield no outcome score -inf. Pass `book_levels` to reuse precomputed
+    order-book levels across calls.
     """
-    best_outcome = None
-    
-    def update_best(outcome):
-        nonlocal best_outcome
-        if outcome:
-            if best_outcome is None or outcome.get('score', -1e9) > best_outcome.get('score', -1e9):
-                best_outcome = outcome
+    scores = np.full(target_bodega_prices.shape, -np.inf)
+    if b == 0:
+        for i, target_price in enumerate(target_bodega_prices):
+            outcome = _calculate_trade_outcome(q1_bod, q2_bod, b, order_book_poly, ada_to_usd, fee_rate, initial_cost_bod_ada, float(target_price))
+            if outcome:
+                scores[i] = outcome['score']
+        return scores
+
+    valid = (target_bodega_prices > 0) & (target_bodega_prices < 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_bod_raw = b * np.log(target_bodega_prices / (1 - target_bodega_prices)) + q2_bod - q1_bod
+    x_bod = np.round(x_bod_raw)
+    poly_shares_to_buy = np.round(x_bod * ada_to_usd)
+    valid &= (x_bod_raw > 0) & (x_bod > 0) & (poly_shares_to_buy > 0)
+    if not valid.any():
+        return scores
+
+    x_bod, poly_shares_to_buy = x_bod[valid], poly_shares_to_buy[valid]
+    cost_bod_ada = b * np.logaddexp((q1_bod + x_bod) / b, q2_bod / b) - initial_cost_bod_ada
+    fee_bod_ada = cost_bod_ada * fee_rate
+    filled_poly, cost_poly_usd = fill_order_book_many(book_levels if book_levels is not None else order_book_levels(order_book_poly), poly_shares_to_buy)
 
+    cost_poly_ada = cost_poly_usd / ada_to_usd if ada_to_usd > 0 else 0
+    comb_usd = (cost_bod_ada + fee_bod_ada + cost_poly_ada) * ada_to_usd
+    profit_usd = np.minimum((x_bod * 0.98) * ada_to_usd, filled_poly * 1.0) - comb_usd
+    with np.errstate(divide='ignore', invalid='ignore'):
+        roi = np.where(comb_usd > 0, profit_usd / comb_usd, 0.0)
+    score = np.where(profit_usd < 0, profit_usd, roi * profit_usd)
+    score[(filled_poly == 0) | np.isnan(score)] = -np.inf
+    scores[valid] = score
+    return scores
+
+def _iterative_search(calculation_func, score_func, **kwargs) -> Optional[Dict]:
+    """
+    Two-stage search for the best trade outcome.
+    Each stage scores all of its adjustments in one vectorized pass via `score_func`;
+    only the winning adjustment is expanded into a full outcome by `calculation_func`.
+    """
     # Stage 1: Coarse search
-    coarse_adjustments = [i / 100.0 for i in range(0, 51)] # 0.00 to 0.50, step 0.01
-    for adj in coarse_adjustments:
-        outcome = calculation_func(target_adjustment=adj, **kwargs)
-        update_best(outcome)
+    coarse_adjustments = np.arange(0, 51) / 100.0 # 0.00 to 0.50, step 0.01
+    coarse_scores = score_func(coarse_adjustments)
+    best_idx = int(np.argmax(coarse_scores))
+    if coarse_scores[best_idx] == -np.inf:
+        return None
+    best_adj, best_score = float(coarse_adjustments[best_idx]), coarse_scores[best_idx]
 
     # Stage 2: Fine search around the best coarse result
-    if best_outcome and best_outcome.get('score', -1) > 0:
-        best_adj_coarse = best_outcome['adjustment']
-        fine_start = max(0, best_adj_coarse - 0.01)
-        fine_adjustments = [fine_start + i * 0.001 for i in range(21)]
-        
-        for adj in fine_adjustments:
-            outcome = calculation_func(target_adjustment=adj, **kwargs)
-            update_best(outcome)
+    if best_score > 0:
+        fine_start = max(0, best_adj - 0.01)
+        fine_adjustments = fine_start + np.arange(21) * 0.001
+        fine_scores = score_func(fine_adjustments)
+        fine_idx = int(np.argmax(fine_scores))
+        if fine_scores[fine_idx] > best_score:
+            best_adj = float(fine_adjustments[fine_idx])
 
-    return best_outcome
+    return calculation_func(target_adjustment=best_adj, **kwargs)
 
 
 # --- Main function ---
@@ -254,7 +298,7 @@ def build_arbitrage_table(
         p_poly_no_best_ask = ORDER_BOOK_NO[0][0]
         implied_poly_yes_price = 1 - p_poly_no_best_ask
         
-        log.info(f"--- Analyzing BUY YES Bodega (vs Poly NO price of {p_poly_no_best_ask:.4f}, implied YES price {implied_poly_yes_price:.4f}) ---")
+        log.debug("--- Analyzing BUY YES Bodega (vs Poly NO price of %.4f, implied YES price %.4f) ---", p_poly_no_best_ask, implied_poly_yes_price)
         
         def calculate_scenario_1(target_adjustment, **kwargs):
             target_price = implied_poly_yes_price - target_adjustment
@@ -269,14 +313,19 @@ def build_arbitrage_table(
             'fee_rate': FEE_RATE, 'initial_cost_bod_ada': initial_cost_bod_ada
         }
 
-        best_outcome = _iterative_search(calculate_scenario_1, **common_args)
+        book_levels_1 = order_book_levels(ORDER_BOOK_NO)
+
+        def score_scenario_1(adjustments):
+            return _calculate_trade_scores(target_bodega_prices=implied_poly_yes_price - adjustments, book_levels=book_levels_1, **common_args)
+
+        best_outcome = _iterative_search(calculate_scenario_1, score_scenario_1, **common_args)
         
         final_outcome = None
         if best_outcome and best_outcome['profit_usd'] > 0:
-            log.info(f"--> Best for BUY YES Bodega is at adjustment {best_outcome['adjustment']:.4f} with profit ${best_outcome['profit_usd']:.2f} and score {best_outcome.get('score',0):.4f}")
+            log.debug("--> Best for BUY YES Bodega is at adjustment %.4f with profit $%.2f and score %.4f", best_outcome['adjustment'], best_outcome['profit_usd'], best_outcome.get('score', 0))
             final_outcome = best_outcome
         else:
-            log.info("No profitable arbitrage for BUY YES Bodega, calculating loss for 1 share.")
+            log.debug("No profitable arbitrage for BUY YES Bodega, calculating loss for 1 share.")
             one_share_outcome = _calculate_trade_outcome_fixed_shares(
                 q1_bod=Q_YES, q2_bod=Q_NO, b=B,
                 order_book_poly=ORDER_BOOK_NO,
@@ -301,7 +350,7 @@ def build_arbitrage_table(
         p_poly_yes_best_ask = ORDER_BOOK_YES[0][0]
         implied_poly_no_price = 1 - p_poly_yes_best_ask
         
-        log.info(f"--- Analyzing BUY NO Bodega (vs Poly YES price of {p_poly_yes_best_ask:.4f}, implied NO price {implied_poly_no_price:.4f}) ---")
+        log.debug("--- Analyzing BUY NO Bodega (vs Poly YES price of %.4f, implied NO price %.4f) ---", p_poly_yes_best_ask, implied_poly_no_price)
 
         def calculate_scenario_2(target_adjustment, **kwargs):
             target_price = implied_poly_no_price - target_adjustment
@@ -316,14 +365,19 @@ def build_arbitrage_table(
             'fee_rate': FEE_RATE, 'initial_cost_bod_ada': initial_cost_bod_ada
         }
         
-        best_outcome = _iterative_search(calculate_scenario_2, **common_args_s2)
+        book_levels_2 = order_book_levels(ORDER_BOOK_YES)
+
+        def score_scenario_2(adjustments):
+            return _calculate_trade_scores(target_bodega_prices=implied_poly_no_price - adjustments, book_levels=book_levels_2, **common_args_s2)
+
+        best_outcome = _iterative_search(calculate_scenario_2, score_scenario_2, **common_args_s2)
 
         final_outcome = None
         if best_outcome and best_outcome['profit_usd'] > 0:
-            log.info(f"--> Best for BUY NO Bodega is at adjustment {best_outcome['adjustment']:.4f} with profit ${best_outcome['profit_usd']:.2f} and score {best_outcome.get('score',0):.4f}")
+            log.debug("--> Best for BUY NO Bodega is at adjustment %.4f with profit $%.2f and score %.4f", best_outcome['adjustment'], best_outcome['profit_usd'], best_outcome.get('score', 0))
             final_outcome = best_outcome
         else:
-            log.info("No profitable arbitrage for BUY NO Bodega, calculating loss for 1 share.")
+            log.debug("No profitable arbitrage for BUY NO Bodega, calculating loss for 1 share.")
             one_share_outcome = _calculate_trade_outcome_fixed_shares(
                 q1_bod=Q_NO, q2_bod=Q_YES, b=B,
                 order_book_poly=ORDER_BOOK_YES,
@@ -5,7 +5,11 @@ import time
 from contextlib import contextmanager
 import logging
 import json
-from typing import Optional, Dict
+import orjson
+import queue
+import threading
+import atexit
+from typing import Callable, Optional, Dict
 
 log = logging.getLogger(__name__)
 DB_PATH = Path(__file__).parent.parent / "market_data.db"
@@ -22,6 +26,97 @@ def get_conn():
         if conn:
             conn.close()
 
+# --- Background Writer ---
+# Trade-path writes are queued and committed by a single writer thread, so callers
+# on the execution path never wait on SQLite. Queued statements are committed in batches.
+# Durability is best-effort: a failed batch is retried, then each statement is retried on
+# its own, and a statement that still fails is logged at CRITICAL level (callers never see it).
+WRITE_BATCH_SIZE = 100
+WRITE_MAX_ATTEMPTS = 5
+WRITE_RETRY_BACKOFF_SECONDS = 0.5
+_write_queue: "queue.Queue[tuple]" = queue.Queue()
+_writer_thread: Optional[threading.Thread] = None
+_writer_lock = threading.Lock()
+_pending_cooldowns: Dict[str, str] = {}  # Cooldowns queued but not yet committed
+_pending_cooldowns_lock = threading.Lock()
+
+def _commit_writes(writes: list):
+    """Executes the given queued statements in one transaction, raising on any failure."""
+    with get_conn() as conn:
+        try:
+            for sql, params, many, _on_commit in writes:
+                if many:
+                    conn.executemany(sql, params)
+                else:
+                    conn.execute(sql, params)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+def _commit_with_retries(writes: list) -> bool:
+    """
+    Commits `writes` as one transaction, retrying transient errors (e.g. a locked database) with backoff.
+    Returns True on success.
+    """
+    for attempt in range(1, WRITE_MAX_ATTEMPTS + 1):
+        try:
+            _commit_writes(writes)
+            return True
+        except sqlite3.OperationalError as e:
+            log.warning(f"Background DB write of {len(writes)} statement(s) failed (attempt {attempt}/{WRITE_MAX_ATTEMPTS}): {e}")
+            if attempt < WRITE_MAX_ATTEMPTS:
+                time.sleep(WRITE_RETRY_BACKOFF_SECONDS * attempt)
+        except Exception as e:
+            # Constraint violations and the like fail the same way every time.
+            log.warning(f"Background DB write of {len(writes)} statement(s) failed: {e}")
+            return False
+    return False
+
+def _drain_writes():
+    """Writer thread loop: commits queued statements in batches of up to WRITE_BATCH_SIZE."""
+    while True:
+        batch = [_write_queue.get()]
+        while len(batch) < WRITE_BATCH_SIZE:
+            try:
+                batch.append(_write_queue.get(timeout=0.01))
+            except queue.Empty:
+                break
+        try:
+            if _commit_with_retries(batch):
+                committed = batch
+            else:
+                # Isolate the failing statement(s) so the rest of the batch still lands.
+                committed = []
+                for write in batch:
+                    if _commit_with_retries([write]):
+                        committed.append(write)
+                    else:
+                        log.critical(f"Background DB write permanently failed and was dropped: {write[0].strip()} params={write[1]!r}")
+            for write in committed:
+                if write[3]:
+                    write[3]()
+        except Exception as e:
+            log.critical(f"Background DB writer failed on a batch of {len(batch)} statement(s): {e}", exc_info=True)
+        finally:
+            for _ in batch:
+                _write_queue.task_done()
+
+def _enqueue_write(sql: str, params, many: bool = False, on_commit: Optional[Callable[[], None]] = None):
+    """Queues a statement for the writer thread, starting it on first use. `on_commit` runs once it is committed."""
+    global _writer_thread
+    if _writer_thread is None:
+        with _writer_lock:
+            if _writer_thread is None:
+                _writer_thread = threading.Thread(target=_drain_writes, name="db-writer", daemon=True)
+                _writer_thread.start()
+                atexit.register(flush_writes)
+    _write_queue.put_nowait((sql, params, many, on_commit))
+
+def flush_writes():
+    """Blocks until every queued background write has been committed (or retried and dropped)."""
+    _write_queue.join()
+
 def init_db():
     """
     Initializes the database, creating tables if they don't exist
@@ -208,6 +303,11 @@ def load_bodega_markets() -> list:
         rows = conn.execute("SELECT * FROM bodega_markets").fetchall()
         return [{"id": r["market_id"], "name": r["market_name"], "deadline": r["deadline"], "fetched_at": r["fetched_at"]} for r in rows]
 
+def load_bodega_market_ids() -> set:
+    """Returns the IDs in the Bodega snapshot without building a dict per market."""
+    with get_conn() as conn:
+        return {r[0] for r in conn.execute("SELECT market_id FROM bodega_markets")}
+
 def load_new_bodega_markets() -> list[dict]:
     with get_conn() as conn:
         rows = conn.execute("SELECT * FROM new_bodega_markets").fetchall()
@@ -218,6 +318,14 @@ def add_new_bodega_market(m: dict):
         conn.execute("INSERT OR IGNORE INTO new_bodega_markets (market_id, market_name, deadline, first_seen) VALUES (?,?,?,?)", (m["id"], m["name"], m["deadline"], int(time.time())))
         conn.commit()
 
+def add_new_bodega_markets(markets: list):
+    """Inserts many new Bodega markets in a single transaction."""
+    now = int(time.time())
+    data = [(m["id"], m["name"], m["deadline"], now) for m in markets]
+    with get_conn() as conn:
+        conn.executemany("INSERT OR IGNORE INTO new_bodega_markets (market_id, market_name, deadline, first_seen) VALUES (?,?,?,?)", data)
+        conn.commit()
+
 def remove_new_bodega_market(market_id: str):
     with get_conn() as conn:
         conn.execute("DELETE FROM new_bodega_markets WHERE market_id=?", (market_id,))
@@ -242,11 +350,24 @@ def load_myriad_markets() -> list:
         rows = conn.execute("SELECT * FROM myriad_markets").fetchall()
         return [dict(r) for r in rows]
 
+def load_myriad_market_ids() -> set:
+    """Returns the IDs in the Myriad snapshot without reading each market's full JSON."""
+    with get_conn() as conn:
+        return {r[0] for r in conn.execute("SELECT id FROM myriad_markets")}
+
 def add_new_myriad_market(m: dict):
     with get_conn() as conn:
         conn.execute("INSERT OR IGNORE INTO new_myriad_markets (market_id, market_slug, market_name, expires_at, first_seen) VALUES (?,?,?,?,?)", (m["id"], m["slug"], m["name"], m["expires_at"], int(time.time())))
         conn.commit()
 
+def add_new_myriad_markets(markets: list):
+    """Inserts many new Myriad markets in a single transaction."""
+    now = int(time.time())
+    data = [(m["id"], m["slug"], m["name"], m["expires_at"], now) for m in markets]
+    with get_conn() as conn:
+        conn.executemany("INSERT OR IGNORE INTO new_myriad_markets (market_id, market_slug, market_name, expires_at, first_seen) VALUES (?,?,?,?,?)", data)
+        conn.commit()
+
 def load_new_myriad_markets() -> list[dict]:
     with get_conn() as conn:
         rows = conn.execute("SELECT * FROM new_myriad_markets").fetchall()
@@ -268,7 +389,11 @@ def save_polymarkets(markets: list):
     now = int(time.time())
     data = [(m["condition_id"], m["question"], now) for m in markets]
     with get_conn() as conn:
-        conn.executemany("INSERT OR REPLACE INTO polymarket_markets (condition_id, question, fetched_at) VALUES (?,?,?)", data)
+        # Upsert in place; INSERT OR REPLACE would delete and re-insert every existing row.
+        conn.executemany("""
+            INSERT INTO polymarket_markets (condition_id, question, fetched_at) VALUES (?,?,?)
+            ON CONFLICT(condition_id) DO UPDATE SET question = excluded.question, fetched_at = excluded.fetched_at
+        """, data)
         conn.commit()
 
 def load_polymarkets() -> list:
@@ -276,41 +401,46 @@ def load_polymarkets() -> list:
         rows = conn.execute("SELECT * FROM polymarket_markets").fetchall()
         return [{"condition_id": r["condition_id"], "question": r["question"], "fetched_at": r["fetched_at"]} for r in rows]
 
+def search_polymarkets(query: str) -> list:
+    """Returns the cached Polymarket markets whose question contains `query` (case-insensitive), filtered in SQL."""
+    pattern = "%" + query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    with get_conn() as conn:
+        rows = conn.execute("SELECT * FROM polymarket_markets WHERE question LIKE ? ESCAPE '\\'", (pattern,)).fetchall()
+        return [{"condition_id": r["condition_id"], "question": r["question"], "fetched_at": r["fetched_at"]} for r in rows]
+
 def save_poly_trades(trades: list):
-    """Saves a list of Polymarket trades to the database, ignoring duplicates."""
-    with get_conn() as conn:
-        to_insert = []
-        for trade in trades:
-            trade_id = trade.get('id')
-            if not trade_id:
-                continue
-
-            matched_amount = 0.0
-            maker_orders = trade.get('maker_orders', [])
-            for maker_order in maker_orders:
-                try:
-                    matched_amount += float(maker_order.get('matched_amount', '0'))
-                except (ValueError, TypeError):
-                    log.warning(f"Could not parse matched_amount in trade {trade_id}: {maker_order.get('matched_amount')}")
-
-            record = (
-                trade_id,
-                trade.get('taker_order_id'),
-                trade.get('market'),
-                matched_amount,
-                trade.get('match_time'),
-                json.dumps(trade)
-            )
-            to_insert.append(record)
-        
-        if to_insert:
-            conn.executemany("""
-                INSERT OR IGNORE INTO polymarket_trades_log 
-                (trade_id, order_id, market_id, matched_amount, match_time, full_response_json) 
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, to_insert)
-            conn.commit()
-            log.info(f"Saved/updated {len(to_insert)} Polymarket trades in the log.")
+    """Queues a list of Polymarket trades for insertion, ignoring duplicates."""
+    to_insert = []
+    for trade in trades:
+        trade_id = trade.get('id')
+        if not trade_id:
+            continue
+
+        matched_amount = 0.0
+        maker_orders = trade.get('maker_orders', [])
+        for maker_order in maker_orders:
+            try:
+                matched_amount += float(maker_order.get('matched_amount', '0'))
+            except (ValueError, TypeError):
+                log.warning(f"Could not parse matched_amount in trade {trade_id}: {maker_order.get('matched_amount')}")
+
+        record = (
+            trade_id,
+            trade.get('taker_order_id'),
+            trade.get('market'),
+            matched_amount,
+            trade.get('match_time'),
+            json.dumps(trade)
+        )
+        to_insert.append(record)
+
+    if to_insert:
+        _enqueue_write("""
+            INSERT OR IGNORE INTO polymarket_trades_log 
+            (trade_id, order_id, market_id, matched_amount, match_time, full_response_json) 
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, to_insert, many=True)
+        log.info(f"Queued {len(to_insert)} Polymarket trades for the log.")
 
 # --- Pairing Functions ---
 def save_manual_pair(bodega_id: str, poly_id: str, is_flipped: int, profit_threshold_usd: float, end_date_override: int = None):
@@ -323,6 +453,19 @@ def load_manual_pairs() -> list[tuple]:
         rows = conn.execute("SELECT bodega_id, poly_condition_id, is_flipped, profit_threshold_usd, end_date_override FROM manual_pairs").fetchall()
         return [(r["bodega_id"], r["poly_condition_id"], r["is_flipped"], r["profit_threshold_usd"], r["end_date_override"]) for r in rows]
 
+def load_active_manual_pairs() -> list[tuple]:
+    """
+    Returns (pair, deadline_ms) for Bodega pairs whose cached market has not passed its deadline.
+    Markets without a cached deadline are kept (deadline None). Pairs without a cached market
+    are left out, as they cannot be checked anyway.
+    """
+    with get_conn() as conn:
+        rows = conn.execute("""
+            SELECT mp.bodega_id, mp.poly_condition_id, mp.is_flipped, mp.profit_threshold_usd, mp.end_date_override, b.deadline
+            FROM manual_pairs mp JOIN bodega_markets b ON b.market_id = mp.bodega_id
+            WHERE b.deadline IS NULL OR b.deadline > ?""", (int(time.time() * 1000),)).fetchall()
+        return [((r["bodega_id"], r["poly_condition_id"], r["is_flipped"], r["profit_threshold_usd"], r["end_date_override"]), r["deadline"]) for r in rows]
+
 def delete_manual_pair(bodega_id: str, poly_id: str):
     with get_conn() as conn:
         conn.execute("DELETE FROM manual_pairs WHERE bodega_id = ? AND poly_condition_id = ?", (bodega_id, poly_id))
@@ -338,6 +481,18 @@ def load_manual_pairs_myriad() -> list[tuple]:
         rows = conn.execute("SELECT myriad_slug, poly_condition_id, is_flipped, profit_threshold_usd, end_date_override, is_autotrade_safe FROM manual_pairs_myriad").fetchall()
         return [(r["myriad_slug"], r["poly_condition_id"], r["is_flipped"], r["profit_threshold_usd"], r["end_date_override"], r["is_autotrade_safe"]) for r in rows]
 
+def load_active_manual_pairs_myriad() -> list[tuple]:
+    """
+    Returns (pair, expires_at) for Myriad pairs whose cached market is still 'open'.
+    Pairs without a cached market are left out, as they cannot be checked anyway.
+    """
+    with get_conn() as conn:
+        rows = conn.execute("""
+            SELECT mp.myriad_slug, mp.poly_condition_id, mp.is_flipped, mp.profit_threshold_usd, mp.end_date_override, mp.is_autotrade_safe, m.expires_at
+            FROM manual_pairs_myriad mp JOIN myriad_markets m ON m.slug = mp.myriad_slug
+            WHERE json_extract(m.full_data_json, '$.state') = 'open'""").fetchall()
+        return [((r["myriad_slug"], r["poly_condition_id"], r["is_flipped"], r["profit_threshold_usd"], r["end_date_override"], r["is_autotrade_safe"]), r["expires_at"]) for r in rows]
+
 def delete_manual_pair_myriad(myriad_slug: str, poly_id: str):
     with get_conn() as conn:
         conn.execute("DELETE FROM manual_pairs_myriad WHERE myriad_slug = ? AND poly_condition_id = ?", (myriad_slug, poly_id))
@@ -359,6 +514,12 @@ def delete_probability_watch(bodega_id: str):
         conn.execute("DELETE FROM probability_watches WHERE bodega_id = ?", (bodega_id,))
         conn.commit()
 
+def delete_probability_watches(bodega_ids: list):
+    """Deletes many probability watches in a single transaction."""
+    with get_conn() as conn:
+        conn.executemany("DELETE FROM probability_watches WHERE bodega_id = ?", [(bodega_id,) for bodega_id in bodega_ids])
+        conn.commit()
+
 def set_config_value(key: str, value: str):
     with get_conn() as conn:
         conn.execute("INSERT OR REPLACE INTO app_config (key, value) VALUES (?, ?)", (key, str(value)))
@@ -370,15 +531,35 @@ def get_config_value(key: str, default: str = None) -> str:
         row = conn.execute("SELECT value FROM app_config WHERE key = ?", (key,)).fetchone()
         return row['value'] if row else default
 
+def get_config_values(keys: list) -> Dict[str, str]:
+    """Reads several config keys in one query. Keys that are not set are omitted."""
+    if not keys:
+        return {}
+    placeholders = ",".join("?" * len(keys))
+    with get_conn() as conn:
+        rows = conn.execute(f"SELECT key, value FROM app_config WHERE key IN ({placeholders})", list(keys)).fetchall()
+        return {r['key']: r['value'] for r in rows}
+
 # --- Arb Executor Functions ---
 
+def _dumps_opportunity(opportunity: Dict) -> str:
+    """Serializes an opportunity message; summaries may carry NumPy scalars from the pricing models."""
+    return orjson.dumps(opportunity, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS).decode()
+
 def add_arb_opportunity(opportunity: Dict):
     """Adds a new arbitrage opportunity to the queue."""
+    add_arb_opportunities([opportunity])
+
+def add_arb_opportunities(opportunities: list):
+    """Adds many arbitrage opportunities to the queue in a single transaction."""
+    if not opportunities:
+        return
+    data = [(o['opportunity_id'], o['timestamp_utc'], _dumps_opportunity(o)) for o in opportunities]
     with get_conn() as conn:
-        conn.execute("INSERT OR IGNORE INTO arb_opportunities (opportunity_id, timestamp_utc, message_json) VALUES (?, ?, ?)",
-                     (opportunity['opportunity_id'], opportunity['timestamp_utc'], json.dumps(opportunity)))
+        conn.executemany("INSERT OR IGNORE INTO arb_opportunities (opportunity_id, timestamp_utc, message_json) VALUES (?, ?, ?)", data)
         conn.commit()
-        log.info(f"Queued arbitrage opportunity {opportunity['opportunity_id']} for {opportunity['market_identifiers']['myriad_slug']}")
+    for o in opportunities:
+        log.info(f"Queued arbitrage opportunity {o['opportunity_id']} for {o['market_identifiers']['myriad_slug']}")
 
 def pop_arb_opportunity() -> Optional[Dict]:
     """Atomically retrieves and deletes the oldest opportunity from the queue."""
@@ -393,7 +574,7 @@ def pop_arb_opportunity() -> Optional[Dict]:
                 cur.execute("DELETE FROM arb_opportunities WHERE opportunity_id = ?", (opp_id,))
                 conn.commit()
                 log.info(f"Popped opportunity {opp_id} from queue.")
-                return json.loads(message_json)
+                return orjson.loads(message_json)
             else:
                 conn.commit() # release lock
                 return None
@@ -423,69 +604,77 @@ def clear_arb_opportunities() -> int:
             return 0
 
 def log_trade_attempt(trade_log: Dict):
-    """Inserts or replaces a record in the automated_trades_log."""
-    with get_conn() as conn:
-        conn.execute("""
-            INSERT OR REPLACE INTO automated_trades_log (
-                trade_id, attempt_timestamp_utc, myriad_slug, polymarket_condition_id,
-                status, status_message, planned_poly_shares, planned_myriad_shares,
-                executed_poly_shares, executed_poly_cost_usd, executed_myriad_shares,
-                executed_myriad_cost_usd, poly_tx_hash, myriad_tx_hash, final_profit_usd,
-                log_details, myriad_api_lookup_status
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            trade_log.get('trade_id'), trade_log.get('attempt_timestamp_utc'),
-            trade_log.get('myriad_slug'), trade_log.get('polymarket_condition_id'),
-            trade_log.get('status'), trade_log.get('status_message'),
-            trade_log.get('planned_poly_shares'), trade_log.get('planned_myriad_shares'),
-            trade_log.get('executed_poly_shares'), trade_log.get('executed_poly_cost_usd'),
-            trade_log.get('executed_myriad_shares'), trade_log.get('executed_myriad_cost_usd'),
-            trade_log.get('poly_tx_hash'), trade_log.get('myriad_tx_hash'),
-            trade_log.get('final_profit_usd'), json.dumps(trade_log.get('log_details')),
-            trade_log.get('myriad_api_lookup_status', 'PENDING')
-        ))
-        conn.commit()
+    """
+    Queues an insert-or-replace of a record in the automated_trades_log.
+    The write is best-effort: it is retried in the background, and a permanent failure is logged, not raised.
+    """
+    _enqueue_write("""
+        INSERT OR REPLACE INTO automated_trades_log (
+            trade_id, attempt_timestamp_utc, myriad_slug, polymarket_condition_id,
+            status, status_message, planned_poly_shares, planned_myriad_shares,
+            executed_poly_shares, executed_poly_cost_usd, executed_myriad_shares,
+            executed_myriad_cost_usd, poly_tx_hash, myriad_tx_hash, final_profit_usd,
+            log_details, myriad_api_lookup_status
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, (
+        trade_log.get('trade_id'), trade_log.get('attempt_timestamp_utc'),
+        trade_log.get('myriad_slug'), trade_log.get('polymarket_condition_id'),
+        trade_log.get('status'), trade_log.get('status_message'),
+        trade_log.get('planned_poly_shares'), trade_log.get('planned_myriad_shares'),
+        trade_log.get('executed_poly_shares'), trade_log.get('executed_poly_cost_usd'),
+        trade_log.get('executed_myriad_shares'), trade_log.get('executed_myriad_cost_usd'),
+        trade_log.get('poly_tx_hash'), trade_log.get('myriad_tx_hash'),
+        trade_log.get('final_profit_usd'), json.dumps(trade_log.get('log_details')),
+        trade_log.get('myriad_api_lookup_status', 'PENDING')
+    ))
 
 def update_trade_log_myriad_details(trade_id: str, details: dict):
-    """Updates a trade log with confirmed Myriad details after API lookup."""
-    with get_conn() as conn:
-        conn.execute("""
-            UPDATE automated_trades_log
-            SET executed_myriad_shares = ?,
-                executed_myriad_cost_usd = ?,
-                myriad_api_lookup_status = ?
-            WHERE trade_id = ?
-        """, (
-            details.get('executed_myriad_shares'),
-            details.get('executed_myriad_cost_usd'),
-            details.get('myriad_api_lookup_status'),
-            trade_id
-        ))
-        conn.commit()
-        log.info(f"Updated Myriad trade details in DB for trade {trade_id}.")
+    """Queues an update of a trade log with confirmed Myriad details after API lookup."""
+    _enqueue_write("""
+        UPDATE automated_trades_log
+        SET executed_myriad_shares = ?,
+            executed_myriad_cost_usd = ?,
+            myriad_api_lookup_status = ?
+        WHERE trade_id = ?
+    """, (
+        details.get('executed_myriad_shares'),
+        details.get('executed_myriad_cost_usd'),
+        details.get('myriad_api_lookup_status'),
+        trade_id
+    ))
+    log.info(f"Queued Myriad trade details update for trade {trade_id}.")
 
 def update_trade_log_myriad_status(trade_id: str, status: str):
-    """Updates just the Myriad API lookup status for a trade log."""
-    with get_conn() as conn:
-        conn.execute("""
-            UPDATE automated_trades_log
-            SET myriad_api_lookup_status = ?
-            WHERE trade_id = ?
-        """, (status, trade_id))
-        conn.commit()
-        log.warning(f"Updated Myriad lookup status to '{status}' for trade {trade_id}.")
+    """Queues an update of just the Myriad API lookup status for a trade log."""
+    _enqueue_write("""
+        UPDATE automated_trades_log
+        SET myriad_api_lookup_status = ?
+        WHERE trade_id = ?
+    """, (status, trade_id))
+    log.warning(f"Queued Myriad lookup status update to '{status}' for trade {trade_id}.")
 
 def get_market_cooldown(market_key: str) -> Optional[str]:
-    """Gets the last trade attempt timestamp for a market."""
+    """Gets the last trade attempt timestamp for a market, including writes still queued."""
+    with _pending_cooldowns_lock:
+        pending = _pending_cooldowns.get(market_key)
+    if pending:
+        return pending
     with get_conn() as conn:
         row = conn.execute("SELECT last_trade_attempt_utc FROM market_cooldowns WHERE market_key = ?", (market_key,)).fetchone()
         return row['last_trade_attempt_utc'] if row else None
 
 def update_market_cooldown(market_key: str, timestamp_utc: str):
-    """Updates the cooldown timestamp for a market."""
-    with get_conn() as conn:
-        conn.execute("INSERT OR REPLACE INTO market_cooldowns (market_key, last_trade_attempt_utc) VALUES (?, ?)", (market_key, timestamp_utc))
-        conn.commit()
+    """Queues an update of the cooldown timestamp for a market; reads see it until the write is committed."""
+    def forget_pending():
+        with _pending_cooldowns_lock:
+            # A newer timestamp may have been queued meanwhile; keep that one.
+            if _pending_cooldowns.get(market_key) == timestamp_utc:
+                del _pending_cooldowns[market_key]
+
+    with _pending_cooldowns_lock:
+        _pending_cooldowns[market_key] = timestamp_utc
+    _enqueue_write("INSERT OR REPLACE INTO market_cooldowns (market_key, last_trade_attempt_utc) VALUES (?, ?)", (market_key, timestamp_utc),
+                   on_commit=forget_pending)
 
 def get_all_traded_myriad_market_info() -> list:
     """
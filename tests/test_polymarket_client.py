@@ -0,0 +1,38 @@
+import orjson
+
+from services.polymarket.client import PolymarketClient
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.content = orjson.dumps(payload)
+        self.status_code = 200
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeSession:
+    """Serves GET /markets/{id} from `markets` and returns an empty book for every token."""
+    def __init__(self, markets):
+        self.markets = markets
+
+    def get(self, url, params=None, timeout=None):
+        return FakeResponse(self.markets[url.rsplit("/", 1)[-1]])
+
+    def post(self, url, json=None, timeout=None):
+        return FakeResponse([{"asset_id": t["token_id"], "asks": [], "bids": []} for t in json])
+
+
+def test_fetch_market_sees_close_despite_cached_metadata():
+    tokens = [{"token_id": "1", "outcome": "Yes"}, {"token_id": "2", "outcome": "No"}]
+    session = FakeSession({"cid": {"question": "Q", "active": True, "closed": False, "tokens": tokens}})
+    client = PolymarketClient(api_url="https://clob.example", session=session)
+
+    # Populate the metadata cache through the cached path used by the matcher.
+    assert client.fetch_market("cid", max_age=10)["closed"] is False
+
+    session.markets["cid"] = {"question": "Q", "active": False, "closed": True, "tokens": tokens}
+    market = client.fetch_market("cid")
+    assert market["closed"] is True
+    assert market["active"] is False